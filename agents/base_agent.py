@@ -2,9 +2,10 @@
 Base Agent - Tüm agent'lar için temel sınıf.
 """
 import asyncio
+import re
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 import structlog
 
 from a2a.protocol import (
@@ -23,6 +24,23 @@ import asyncio
 
 logger = structlog.get_logger()
 
+# Emoji pattern - Unicode emoji aralıkları (tüm agent'lar paylaşır)
+_EMOJI_RE = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags
+    "\U00002702-\U000027B0"  # dingbats
+    "\U000024C2-\U0001F251"  # enclosed characters
+    "\U0001F900-\U0001F9FF"  # supplemental symbols
+    "\U0001FA00-\U0001FA6F"  # chess symbols
+    "\U0001FA70-\U0001FAFF"  # symbols extended-A
+    "\U00002600-\U000026FF"  # misc symbols
+    "]+",
+    flags=re.UNICODE
+)
+
 
 class BaseAgent(ABC):
     """
@@ -290,6 +308,19 @@ class BaseAgent(ABC):
             metadata=metadata or {}
         )
 
+    def _remove_emojis(self, text: str) -> str:
+        """Metinden emojileri kaldırır."""
+        return _EMOJI_RE.sub('', text).strip()
+
+    def _remove_emojis_all(self, texts: List[str]) -> List[str]:
+        """Birden fazla metinden emojileri tek regex geçişiyle kaldırır."""
+        # NUL ayırıcı emoji aralıklarında olmadığı için sınırlar korunur
+        parts = _EMOJI_RE.sub('', "\x00".join(texts)).split("\x00")
+        if len(parts) != len(texts):
+            # Metinlerden biri NUL içeriyorsa tek tek temizle
+            return [self._remove_emojis(text) for text in texts]
+        return [part.strip() for part in parts]
+
     @property
     def agent_card(self) -> AgentCard:
         """Agent kartını döndürür."""
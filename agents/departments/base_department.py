@@ -6,16 +6,22 @@ Her departman agentı veritabanı ve RAG erişimine sahiptir.
 from abc import abstractmethod
 from typing import Any, Dict, Optional
 import asyncio
+import re
 import structlog
 
 from a2a.protocol import A2ATask, create_response, create_error_response
 from a2a.agent_card import AgentSkill
 from agents.base_agent import BaseAgent
 from llm.provider import LLMProvider
+from llm.prompts import with_agent_rules
 from rag.rag_engine import RAGEngine
 
 logger = structlog.get_logger()
 
+# Modül yüklenirken bir kez derlenen RAG cevabı temizleme desenleri
+_SOURCE_REF_RE = re.compile(r'\[Kaynak \d+[^\]]*\]\n?')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
 
 class BaseDepartmentAgent(BaseAgent):
     """
@@ -185,11 +191,9 @@ class BaseDepartmentAgent(BaseAgent):
 Aşağıdaki bilgileri kullanarak kullanıcıya net ve anlaşılır bir cevap oluştur.
 
 KURALLAR:
-- Emoji KULLANMA
 - SADECE verilen bilgileri kullan, yeni bilgi ekleme
 - Bilgilerde cevap YOKSA, "Bu konuda ilgili bilgi bulunamadı." yaz
 - Kaynak referanslarını ([Kaynak X] gibi) kaldır
-- Kısa ve öz yanıt ver
 - Gereksiz süsleme yapma
 
 Bilgiler:
@@ -205,7 +209,8 @@ Yanıt:"""
             timeout_seconds = 25.0 if is_complex else 20.0
             
             formatted = await asyncio.wait_for(
-                self.llm.generate(prompt, system_prompt=self._get_system_prompt(), max_tokens=max_tokens),
+                # Emoji/kısalık kuralı sistem promptunda bir kez gider (AGENT_RULES)
+                self.llm.generate(prompt, system_prompt=with_agent_rules(self._get_system_prompt()), max_tokens=max_tokens),
                 timeout=timeout_seconds
             )
 
@@ -226,36 +231,15 @@ Yanıt:"""
             cleaned = self._clean_rag_answer(answer)
             return cleaned
 
-    def _remove_emojis(self, text: str) -> str:
-        """Metinden emojileri kaldırır."""
-        import re
-        emoji_pattern = re.compile(
-            "["
-            "\U0001F600-\U0001F64F"
-            "\U0001F300-\U0001F5FF"
-            "\U0001F680-\U0001F6FF"
-            "\U0001F1E0-\U0001F1FF"
-            "\U00002702-\U000027B0"
-            "\U000024C2-\U0001F251"
-            "\U0001F900-\U0001F9FF"
-            "\U0001FA00-\U0001FA6F"
-            "\U0001FA70-\U0001FAFF"
-            "\U00002600-\U000026FF"
-            "]+",
-            flags=re.UNICODE
-        )
-        return emoji_pattern.sub('', text).strip()
-    
     def _clean_rag_answer(self, answer: str) -> str:
         """
         RAG cevabından kaynak referanslarını temizler (basit regex ile).
         LLM kullanmadan hızlı temizleme.
         """
-        import re
         # [Kaynak X - ...] formatını kaldır
-        cleaned = re.sub(r'\[Kaynak \d+[^\]]*\]\n?', '', answer)
+        cleaned = _SOURCE_REF_RE.sub('', answer)
         # Çoklu boş satırları tek boş satıra çevir
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
+        cleaned = _BLANK_LINES_RE.sub('\n\n', cleaned)
         return cleaned.strip()
 
     def _format_db_results(self, results: Dict[str, Any]) -> str:
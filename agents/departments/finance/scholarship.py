@@ -81,8 +81,11 @@ class ScholarshipAgent(BaseDepartmentAgent):
         results = {}
 
         if student_id:
+            # Burs ve akademik durum tek snapshot sorgusu ile gelir
+            snapshot = await self.db.get_student_snapshot(student_id) or {}
+
             # Aktif burs durumu
-            scholarship = await self.db.get_scholarship_status(student_id)
+            scholarship = snapshot.get("scholarship_status")
             if scholarship:
                 results["burs_durumu"] = {
                     "aktif_burs": scholarship.get("active_scholarship"),
@@ -98,7 +101,7 @@ class ScholarshipAgent(BaseDepartmentAgent):
                 results["basvurular"] = applications
 
             # Akademik durum (burs kriteri)
-            academic = await self.db.get_academic_status(student_id)
+            academic = snapshot.get("academic_status")
             if academic:
                 results["akademik_durum"] = {
                     "gano": academic.get("gpa"),
@@ -1,6 +1,8 @@
 """
 Course Agent - Ders işlemleri agentı.
 """
+import re
+from dataclasses import dataclass, fields
 from typing import Any, Dict, List, Optional
 import structlog
 
@@ -12,6 +14,37 @@ from rag.rag_engine import RAGEngine
 
 logger = structlog.get_logger()
 
+# Anahtar kelimeler modül yüklenirken derlenir. re.IGNORECASE Türkçe
+# I/ı/İ/i harflerini eşdeğer saydığı için sorgu lower() ile kopyalanmaz.
+_DERS_KAYDI_RE = re.compile(r"ders kaydı|ders kayıt", re.IGNORECASE)
+_NOT_RE = re.compile(r"not", re.IGNORECASE)
+_NOT_SORGU_RE = re.compile(r"sorgula|görmek", re.IGNORECASE)
+_DERS_KEYWORDS_RE = re.compile(
+    r"ders|kayıt|not|program|kredi|sınav|final|vize", re.IGNORECASE
+)
+
+
+@dataclass(slots=True)
+class CourseDBResults:
+    """CourseAgent veritabanı sonuçları (sabit alanlı yanıt zarfı)."""
+
+    kayit_durumu: Optional[Dict[str, Any]] = None
+    mevcut_dersler: Optional[List[Dict[str, Any]]] = None
+    akademik_durum: Optional[Dict[str, Any]] = None
+    harc_durumu: Optional[Dict[str, Any]] = None
+
+    def is_empty(self) -> bool:
+        """Hiçbir alan doldurulmamışsa True döner."""
+        return all(getattr(self, f.name) is None for f in fields(self))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Dolu alanları dict olarak döndürür (formatlama için)."""
+        return {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if getattr(self, f.name) is not None
+        }
+
 
 class CourseAgent(BaseDepartmentAgent):
     """
@@ -72,36 +105,38 @@ class CourseAgent(BaseDepartmentAgent):
         self,
         query: str,
         data: Optional[Dict[str, Any]] = None
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[CourseDBResults]:
         """Ders veritabanından bilgi çeker."""
         if not self.db:
             return None
 
         student_id = data.get("user_id") if data else None
-        query_lower = query.lower()
 
-        results = {}
+        results = CourseDBResults()
 
         if student_id:
             # Ders kaydı durumu
             registration_status = await self.db.get_course_registration_status(student_id)
             if registration_status:
-                results["kayit_durumu"] = {
+                results.kayit_durumu = {
                     "kayit_acik_mi": registration_status.get("is_open"),
                     "kayit_baslangic": registration_status.get("start_date"),
                     "kayit_bitis": registration_status.get("end_date"),
                     "onay_durumu": registration_status.get("approval_status")
                 }
 
+            # Dersler, akademik durum ve harç tek snapshot sorgusu ile gelir
+            snapshot = await self.db.get_student_snapshot(student_id) or {}
+
             # Mevcut dersler
-            current_courses = await self.db.get_current_courses(student_id)
+            current_courses = snapshot.get("current_courses")
             if current_courses:
-                results["mevcut_dersler"] = current_courses
+                results.mevcut_dersler = current_courses
 
             # Akademik durum (ders kaydı için)
-            academic_status = await self.db.get_academic_status(student_id)
+            academic_status = snapshot.get("academic_status")
             if academic_status:
-                results["akademik_durum"] = {
+                results.akademik_durum = {
                     "gano": academic_status.get("gpa"),
                     "donem": academic_status.get("current_semester"),
                     "max_kredi": academic_status.get("max_credits", 30),
@@ -109,19 +144,19 @@ class CourseAgent(BaseDepartmentAgent):
                 }
 
             # Harç durumu (ders kaydı için önemli)
-            tuition_status = await self.db.get_tuition_status(student_id)
+            tuition_status = snapshot.get("tuition_status")
             if tuition_status:
-                results["harc_durumu"] = {
+                results.harc_durumu = {
                     "borc_var_mi": tuition_status.get("has_debt", False),
                     "borc_miktari": tuition_status.get("debt_amount", 0)
                 }
 
-        return results if results else None
+        return None if results.is_empty() else results
 
     async def generate_agent_response(
         self,
         query: str,
-        db_results: Optional[Dict[str, Any]] = None,
+        db_results: Optional[CourseDBResults] = None,
         rag_results: Optional[Dict[str, Any]] = None,
         data: Optional[Dict[str, Any]] = None,
         dependency_results: Optional[Dict[str, Any]] = None
@@ -131,10 +166,8 @@ class CourseAgent(BaseDepartmentAgent):
 
         dependency_results: Bağımlılık sonuçları (check_fee_status, check_academic_status)
         """
-        query_lower = query.lower()
-
         # Ders kaydı yapabilir miyim?
-        if "ders kaydı" in query_lower or "ders kayıt" in query_lower or "ders kaydi" in query_lower:
+        if _DERS_KAYDI_RE.search(query):
             response_parts = []
             can_register = True
 
@@ -155,9 +188,9 @@ class CourseAgent(BaseDepartmentAgent):
                     response_parts.append("    -> Ders kaydi icin once harc borcunuzun odenmesi gerekir.")
                 else:
                     response_parts.append("[+] Harc durumu: Borcunuz bulunmamaktadir.")
-            elif db_results and "harc_durumu" in db_results:
+            elif db_results and db_results.harc_durumu is not None:
                 # Fallback: db sonucu
-                harc = db_results["harc_durumu"]
+                harc = db_results.harc_durumu
                 if harc.get("borc_var_mi"):
                     harc_ok = False
                     can_register = False
@@ -183,9 +216,9 @@ class CourseAgent(BaseDepartmentAgent):
                     response_parts.append("    -> Akademik durumunuz ders kaydi icin uygun degil.")
                 else:
                     response_parts.append(f"[+] Akademik durum: GPA {gpa} - Uygun")
-            elif db_results and "akademik_durum" in db_results:
+            elif db_results and db_results.akademik_durum is not None:
                 # Fallback: db sonucu
-                akademik = db_results["akademik_durum"]
+                akademik = db_results.akademik_durum
                 gpa = akademik.get("gano", 0)
                 if gpa < 2.0:
                     academic_ok = False
@@ -195,8 +228,8 @@ class CourseAgent(BaseDepartmentAgent):
                     response_parts.append(f"[+] Akademik durum: GPA {gpa} - Uygun")
 
             # 3. Kayit donemi kontrolu
-            if db_results and "kayit_durumu" in db_results:
-                kayit = db_results["kayit_durumu"]
+            if db_results and db_results.kayit_durumu is not None:
+                kayit = db_results.kayit_durumu
                 if kayit.get("kayit_acik_mi"):
                     response_parts.append(f"[+] Ders kayit donemi aciktir.")
                     response_parts.append(f"    Bitis: {kayit.get('kayit_bitis', 'Bilinmiyor')}")
@@ -221,7 +254,7 @@ class CourseAgent(BaseDepartmentAgent):
             return "\n".join(response_parts) if response_parts else await super().generate_agent_response(query, db_results, rag_results, data)
 
         # Not sorgulama
-        if "not" in query_lower and ("sorgula" in query_lower or "görmek" in query_lower):
+        if _NOT_RE.search(query) and _NOT_SORGU_RE.search(query):
             response = """Notlarınızı görmek için:
 
 1. OBS: obs.universite.edu.tr → Not Bilgileri
@@ -229,17 +262,14 @@ class CourseAgent(BaseDepartmentAgent):
 
 Not girişleri final döneminden sonra yapılır."""
 
-            if db_results and "mevcut_dersler" in db_results:
-                dersler = db_results["mevcut_dersler"]
+            if db_results and db_results.mevcut_dersler is not None:
+                dersler = db_results.mevcut_dersler
                 response += f"\n\nBu dönem aldığınız ders sayısı: {len(dersler)}"
 
             return response
 
         # Ders ile ilgili keyword kontrolu - sadece ilgili sorgularda veri dondur
-        ders_keywords = ["ders", "kayit", "kayıt", "not", "program", "kredi", "sinav", "sınav", "final", "vize"]
-        has_relevant_keyword = any(kw in query_lower for kw in ders_keywords)
-
-        if not has_relevant_keyword:
+        if not _DERS_KEYWORDS_RE.search(query):
             # Ilgisiz sorgu - "bulunamadi" don
             return "Bu konuda ilgili bilgi bulunamadi."
 
@@ -255,3 +285,9 @@ Not girişleri final döneminden sonra yapılır."""
             return self._format_db_results(db_results)
 
         return "Bu konuda ilgili bilgi bulunamadi."
+
+    def _format_db_results(self, results: Any) -> str:
+        """CourseDBResults zarfını dict'e çevirip temel formatlayıcıya verir."""
+        if isinstance(results, CourseDBResults):
+            results = results.as_dict()
+        return super()._format_db_results(results)
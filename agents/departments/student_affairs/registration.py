@@ -1,6 +1,7 @@
 """
 Registration Agent - Kayıt ve belge işlemleri agentı.
 """
+import re
 from typing import Any, Dict, List, Optional
 import structlog
 
@@ -12,6 +13,48 @@ from rag.rag_engine import RAGEngine
 
 logger = structlog.get_logger()
 
+# Anahtar kelimeler modül yüklenirken derlenir. re.IGNORECASE Türkçe
+# I/ı/İ/i harflerini eşdeğer saydığı için sorgu lower() ile kopyalanmaz.
+_OGRENCI_BELGESI_RE = re.compile(r"öğrenci belgesi", re.IGNORECASE)
+_TRANSKRIPT_RE = re.compile(r"transkript", re.IGNORECASE)
+_KAYIT_RE = re.compile(r"kayıt", re.IGNORECASE)
+_KAYIT_SILME_RE = re.compile(r"sil|dondur|iptal", re.IGNORECASE)
+_KAYIT_DURUM_RE = re.compile(r"durum|aktif", re.IGNORECASE)
+_KAYIT_KEYWORDS_RE = re.compile(
+    r"kayıt|belge|transkript|mezuniyet|durum|aktif", re.IGNORECASE
+)
+
+# Sabit yanıt şablonları modül yüklenirken bir kez oluşturulur; yanıtlar
+# parça listesi ile "".join edilerek ara string kopyaları oluşturulmaz.
+_OGRENCI_BELGESI_TMPL = """Öğrenci belgesi almak için:
+
+1. E-Devlet üzerinden: turkiye.gov.tr → Öğrenci Belgesi Sorgulama
+2. OBS üzerinden: obs.universite.edu.tr → Belgelerim → Öğrenci Belgesi
+3. Öğrenci İşleri'nden: Kimlik ibrazı ile (1-2 iş günü)
+
+E-Devlet ve OBS'den alınan belgeler karekodlu ve resmi geçerliliğe sahiptir."""
+
+_TRANSKRIPT_TMPL = """Transkript (not dökümü) almak için:
+
+1. OBS üzerinden: obs.universite.edu.tr → Belgelerim → Transkript
+2. Öğrenci İşleri'nden: Resmi mühürlü transkript (3-5 iş günü)
+
+Not: Resmi kurumlara verilecek transkriptler için mühürlü belge gerekebilir."""
+
+_KAYIT_SILME_TMPL = """Kayıt silme/dondurma işlemleri için:
+
+1. Öğrenci İşleri Daire Başkanlığı'na başvurun
+2. Gerekli belgeler:
+   - Dilekçe
+   - Kimlik fotokopisi
+   - Öğrenci belgesi
+
+3. İşlem süresi: 5-7 iş günü
+
+ÖNEMLİ: Kayıt silme işlemi geri alınamaz. Lütfen dikkatli karar verin.
+
+Detaylı bilgi için: ogrenciisleri@universite.edu.tr veya 1234 (dahili)"""
+
 
 class RegistrationAgent(BaseDepartmentAgent):
     """
@@ -78,13 +121,15 @@ class RegistrationAgent(BaseDepartmentAgent):
             return None
 
         student_id = data.get("user_id") if data else None
-        query_lower = query.lower()
 
         results = {}
 
         if student_id:
+            # Temel bilgi ve akademik durum tek snapshot sorgusu ile gelir
+            snapshot = await self.db.get_student_snapshot(student_id) or {}
+
             # Öğrenci temel bilgileri
-            student_info = await self.db.get_student_info(student_id)
+            student_info = snapshot.get("student_info")
             if student_info:
                 results["ogrenci_bilgisi"] = {
                     "ad_soyad": student_info.get("full_name"),
@@ -96,7 +141,7 @@ class RegistrationAgent(BaseDepartmentAgent):
                 }
 
             # Akademik durum
-            academic_status = await self.db.get_academic_status(student_id)
+            academic_status = snapshot.get("academic_status")
             if academic_status:
                 results["akademik_durum"] = {
                     "gano": academic_status.get("gpa"),
@@ -115,72 +160,48 @@ class RegistrationAgent(BaseDepartmentAgent):
         data: Optional[Dict[str, Any]] = None
     ) -> str:
         """Kayıt/belge yanıtı oluşturur."""
-        query_lower = query.lower()
 
         # Önce RAG sonuçlarını kontrol et (kurallar, prosedürler, nasıl yapılır soruları için)
         # Base class'taki _format_rag_results metodu zaten RAG sonuçlarını formatlıyor
         # Burada özel bir şey yapmaya gerek yok, base class'a bırak
 
         # Öğrenci belgesi
-        if "öğrenci belgesi" in query_lower:
-            response = """Öğrenci belgesi almak için:
-
-1. E-Devlet üzerinden: turkiye.gov.tr → Öğrenci Belgesi Sorgulama
-2. OBS üzerinden: obs.universite.edu.tr → Belgelerim → Öğrenci Belgesi
-3. Öğrenci İşleri'nden: Kimlik ibrazı ile (1-2 iş günü)
-
-E-Devlet ve OBS'den alınan belgeler karekodlu ve resmi geçerliliğe sahiptir."""
+        if _OGRENCI_BELGESI_RE.search(query):
+            parts = [_OGRENCI_BELGESI_TMPL]
 
             if db_results and "ogrenci_bilgisi" in db_results:
                 ogrenci = db_results["ogrenci_bilgisi"]
-                response += f"\n\nKayıt Durumunuz: {ogrenci.get('kayit_durumu', 'Bilinmiyor')}"
+                parts.append(f"\n\nKayıt Durumunuz: {ogrenci.get('kayit_durumu', 'Bilinmiyor')}")
 
-            return response
+            return "".join(parts)
 
         # Transkript
-        if "transkript" in query_lower:
-            response = """Transkript (not dökümü) almak için:
-
-1. OBS üzerinden: obs.universite.edu.tr → Belgelerim → Transkript
-2. Öğrenci İşleri'nden: Resmi mühürlü transkript (3-5 iş günü)
-
-Not: Resmi kurumlara verilecek transkriptler için mühürlü belge gerekebilir."""
+        if _TRANSKRIPT_RE.search(query):
+            parts = [_TRANSKRIPT_TMPL]
 
             if db_results and "akademik_durum" in db_results:
                 akademik = db_results["akademik_durum"]
-                response += f"\n\nMevcut GANO: {akademik.get('gano', 'Hesaplanmamış')}"
-                response += f"\nTamamlanan Kredi: {akademik.get('tamamlanan_kredi', 0)}"
+                parts.append(f"\n\nMevcut GANO: {akademik.get('gano', 'Hesaplanmamış')}")
+                parts.append(f"\nTamamlanan Kredi: {akademik.get('tamamlanan_kredi', 0)}")
 
-            return response
+            return "".join(parts)
 
         # Kayıt silme, kayıt dondurma gibi işlemler
-        if "kayıt" in query_lower and ("sil" in query_lower or "dondur" in query_lower or "iptal" in query_lower):
+        if _KAYIT_RE.search(query) and _KAYIT_SILME_RE.search(query):
             # Base class'taki _format_rag_results zaten RAG sonuçlarını formatlıyor
             # Eğer RAG sonucu varsa base class handle edecek, yoksa fallback bilgi ver
             if not rag_results or not rag_results.get("answer"):
                 # Fallback: Genel bilgi
-                response = """Kayıt silme/dondurma işlemleri için:
-            
-1. Öğrenci İşleri Daire Başkanlığı'na başvurun
-2. Gerekli belgeler:
-   - Dilekçe
-   - Kimlik fotokopisi
-   - Öğrenci belgesi
-   
-3. İşlem süresi: 5-7 iş günü
-
-ÖNEMLİ: Kayıt silme işlemi geri alınamaz. Lütfen dikkatli karar verin.
-
-Detaylı bilgi için: ogrenciisleri@universite.edu.tr veya 1234 (dahili)"""
+                parts = [_KAYIT_SILME_TMPL]
                 
                 if db_results and "ogrenci_bilgisi" in db_results:
                     ogrenci = db_results["ogrenci_bilgisi"]
-                    response += f"\n\nMevcut Kayıt Durumunuz: {ogrenci.get('kayit_durumu', 'Bilinmiyor')}"
+                    parts.append(f"\n\nMevcut Kayıt Durumunuz: {ogrenci.get('kayit_durumu', 'Bilinmiyor')}")
                 
-                return response
+                return "".join(parts)
 
         # Kayıt durumu
-        if "kayıt" in query_lower and ("durum" in query_lower or "aktif" in query_lower):
+        if _KAYIT_RE.search(query) and _KAYIT_DURUM_RE.search(query):
             if db_results and "ogrenci_bilgisi" in db_results:
                 ogrenci = db_results["ogrenci_bilgisi"]
                 return f"""Kayıt durumunuz aşağıdaki gibidir:
@@ -195,10 +216,7 @@ Giriş Yılı: {ogrenci.get('giris_yili', 'Bilinmiyor')}"""
             return "Kayıt durumunuzu sorgulamak için öğrenci numaranızla giriş yapmanız gerekmektedir."
 
         # Kayit/belge ile ilgili keyword kontrolu - sadece ilgili sorgularda veri dondur
-        kayit_keywords = ["kayit", "kayıt", "belge", "transkript", "mezuniyet", "durum", "aktif"]
-        has_relevant_keyword = any(kw in query_lower for kw in kayit_keywords)
-
-        if not has_relevant_keyword:
+        if not _KAYIT_KEYWORDS_RE.search(query):
             return "Bu konuda ilgili bilgi bulunamadi."
 
         # Ilgili sorgu - RAG varsa formatla
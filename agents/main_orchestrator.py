@@ -5,10 +5,15 @@ Gelen istekleri analiz eder, görevlere ayırır ve
 departman orchestrator'larına dağıtır.
 """
 import asyncio
+import copy
 import json
+import os
 import re
 import uuid
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, replace
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 import structlog
 
 from a2a.protocol import (
@@ -25,14 +30,23 @@ from a2a.protocol import (
 )
 from a2a.agent_card import AgentSkill, agent_registry
 from a2a.client import A2AClient
+from database.connection import student_cache_scope
 from llm.provider import LLMProvider
+from llm.batcher import AsyncLLMBatcher
 from llm.prompts import SystemPrompts
 from rag.rag_engine import RAGEngine
 from .base_agent import BaseAgent, DepartmentOrchestrator
-from task_queue_module.task_queue import InMemoryQueue
 
 logger = structlog.get_logger()
 
+# LLM yanıtlarını parse etmek için orjson varsa onu kullan (opsiyonel bağımlılık).
+# orjson.JSONDecodeError, json.JSONDecodeError alt sınıfıdır; hata yakalama aynı kalır.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 
 # Departman anahtar kelimeleri (ASCII ve Türkçe karakter alternatifleri)
 DEPARTMENT_KEYWORDS = {
@@ -77,19 +91,166 @@ TASK_TYPE_KEYWORDS = {
     "check_library_card": ["kütüphane kartı", "kutuphane karti", "kart durumu"]
 }
 
-# Task bağımlılık metadata'sı
-TASK_DEPENDENCIES = {
-    "check_course_registration": [
+class _KeywordMatcher:
+    """
+    Etiketli anahtar kelime listesini tek geçişte tarayan eşleştirici.
+
+    Tüm kelimeler tek bir regex alternasyonunda derlenir (en uzun önce) ve
+    lookahead ile sorgunun her konumunda denenir. Bir konumda eşleşen kısa
+    kelimeler uzun olanın önekidir; bu yüzden her kelimeye öneklerinin
+    etiketleri de önceden eklenir. Sonuç, her etiket için ayrı ayrı
+    `keyword in text` taramasıyla aynıdır (Aho-Corasick çıktısına denk).
+    """
+
+    def __init__(self, keywords_by_tag: Dict[str, List[str]]):
+        self._tag_order = tuple(keywords_by_tag)
+        tags_by_keyword: Dict[str, set] = {}
+        for tag, keywords in keywords_by_tag.items():
+            for keyword in keywords:
+                tags_by_keyword.setdefault(keyword, set()).add(tag)
+
+        self._tags: Dict[str, frozenset] = {
+            keyword: frozenset().union(*(
+                tags for other, tags in tags_by_keyword.items()
+                if keyword.startswith(other)
+            ))
+            for keyword in tags_by_keyword
+        }
+        alternation = "|".join(
+            re.escape(k) for k in sorted(self._tags, key=len, reverse=True)
+        )
+        self._pattern = re.compile(f"(?=({alternation}))")
+
+    def tags(self, text: str) -> set:
+        """Metinde geçen anahtar kelimelerin etiketlerini döndürür."""
+        found = set()
+        for match in self._pattern.finditer(text):
+            found |= self._tags[match.group(1)]
+        return found
+
+    def ordered_tags(self, text: str) -> List[str]:
+        """Eşleşen etiketleri tanım sırasıyla, tekrarsız döndürür."""
+        found = self.tags(text)
+        return [tag for tag in self._tag_order if tag in found]
+
+
+_TASK_TYPE_MATCHER = _KeywordMatcher(TASK_TYPE_KEYWORDS)
+_DEPARTMENT_MATCHER = _KeywordMatcher(DEPARTMENT_KEYWORDS)
+
+# LLM yanıtı parse edilemediğinde çoklu sorular için kullanılan anahtar kelimeler
+_LLM_FALLBACK_MATCHER = _KeywordMatcher({
+    "check_fee_status": ["borç", "borc", "harc", "harç"],
+    # Yalın "kayıt" kayıt dondurma/silme sorularını da yakaladığı için kullanılmaz
+    "check_course_registration": ["ders kaydı", "ders kaydi", "kayıt yap", "kayit yap", "ders al"],
+    "check_academic_status": ["not ortalaması", "not ortalamasi", "gpa", "akademik durum"],
+    "check_scholarship": ["burs", "burs başvurusu", "burs basvurusu"]
+})
+# Fallback etiketinden üretilecek görev: task_type -> (department, priority)
+_LLM_FALLBACK_TASKS: Dict[str, Tuple[str, int]] = {
+    "check_fee_status": ("finance", 1),
+    "check_course_registration": ("student_affairs", 2),
+    "check_academic_status": ("academic_affairs", 1),
+    "check_scholarship": ("finance", 3)
+}
+# Çoklu soruda bu kadar farklı görev tespit edilirse LLM analizi atlanır
+_KEYWORD_SHORT_CIRCUIT_MIN_TASKS = 2
+
+# LLM yanıtından JSON çıkarma / düzeltme desenleri
+_JSON_COMMA_SCAN_RE = re.compile(r'[,"\\]')
+_CLOSING_BRACKET_RE = re.compile(r'\s*[}\]]')
+# Son çare: string içindeki kaçışsız çift tırnak sezgisi (yalnızca ikinci denemede)
+_DOUBLE_QUOTE_FIX_RE = re.compile(r'([^\\])"([^",:}\]]*)"([^",:}\]]*)"')
+# JSON tarayıcısının durum değiştirdiği karakterler; diğerleri regex ile atlanır
+_JSON_SPECIAL_RE = re.compile(r'[{}"\\]')
+
+# Sentez kararında ilişkili soru bağlaçları (" hem de " zaten " hem " ile yakalanır)
+_CONNECTORS_RE = re.compile(r" (?:ve|ile|hem|ayrıca|aynı zamanda) ")
+
+# Öğrenci numarası: daha uzun bir sayının parçası olmayan 8-10 haneli sayı
+# ("öğrenci no: 20220015", "20220015 numaralı" vb. tek taramada yakalanır)
+_STUDENT_ID_RE = re.compile(r"(?<!\d)(\d{8,10})(?!\d)")
+
+# Belirsizlik göstergeleri (_is_query_ambiguous). Soru kelimeleri tam kelime
+# olarak aranır ("ne" başka kelimelerin içinde eşleşmesin); çekim eki alan
+# isimler kök + ek olarak eşlenir ("kurallarını", "prosedürleri", "süreçleri").
+# "ne zaman", "ne yer", "nasıl yapılır" gibi ifadeler "ne"/"nasıl" ile zaten
+# yakalandığı için ayrıca yazılmaz; çok kelimelik ifadeler alt metin aranır.
+_AMBIGUOUS_RE = re.compile(
+    r"\b(?:nasıl|neden|nedir|ne|kim(?:ler\w*|in|e|i|den)?"
+    r"|nere\w*|hangi\w*|kural\w*|prosedür\w*|süre(?:ç|ci)\w*)\b"
+    r"|öğrenebilir miyim|öğrenmek istiyorum|bilgi almak"
+    r"|silebilir miyim|yapabilir miyim|edebilir miyim"
+)
+
+# _analyze_request sonuç önbelleği (TTL'li LRU): en fazla tutulacak analiz
+# sayısı ve bir analizin geçerlilik süresi
+_ANALYSIS_CACHE_SIZE = 512
+_ANALYSIS_CACHE_TTL = 300.0
+
+# LLM plan önbelleği: normalize edilmiş sorgu -> doğrulanmış plan (TTL'li LRU).
+# Rakam içeren (öğrenci no vb. kişiye özgü) sorgular önbelleğe alınmaz.
+_PLAN_CACHE_SIZE = 1024
+_PLAN_CACHE_TTL = 300.0
+_WHITESPACE_RE = re.compile(r"\s+")
+_DIGIT_RE = re.compile(r"\d")
+
+# Sentezlenen yanıtın uzunluk sınırı; LLM yanıtında emoji taraması sınırın
+# bu kadar ötesine kadar yapılır, kalanı zaten kesilir.
+_MAX_RESPONSE_LEN = 3000
+_TRUNCATE_SCAN_SLACK = 256
+
+# Adaptif LLM timeout: rol başına son gecikmeler, p95 * çarpan, alt sınır.
+# Yeterli örnek birikene kadar sabit varsayılan timeout'lar kullanılır.
+_LLM_LATENCY_WINDOW = 200
+_LLM_LATENCY_MIN_SAMPLES = 20
+_LLM_TIMEOUT_P95_FACTOR = 1.5
+_LLM_MIN_TIMEOUT = 5.0
+
+# Departman adı normalizasyonu (Türkçe → İngilizce); geçerli İngilizce
+# adlar kendilerine eşlenir. LLM bazen Türkçe departman adı döndürür.
+_DEPT_NORMALIZATION = {
+    "kütüphane": "library",
+    "kutuphane": "library",
+    "bilgi işlem": "it",
+    "teknoloji": "it",
+    "öğrenci işleri": "student_affairs",
+    "ogrenci isleri": "student_affairs",
+    "mali işler": "finance",
+    "mali isler": "finance",
+    "akademik işler": "academic_affairs",
+    "akademik isler": "academic_affairs",
+    "it": "it",
+    "student_affairs": "student_affairs",
+    "finance": "finance",
+    "academic_affairs": "academic_affairs",
+    "library": "library"
+}
+
+# Task tiplerinin ait olduğu departmanlar
+TASK_TO_DEPARTMENT = {
+    "check_fee_status": "finance",
+    "check_course_registration": "student_affairs",
+    "check_academic_status": "academic_affairs",
+    "check_payment_status": "finance",
+    "password_reset": "it",
+    "check_scholarship": "finance",
+    "search_book": "library",
+    "check_library_card": "library"
+}
+
+# Task bağımlılık metadata'sı (salt okunur; task'lar bu tuple'ları paylaşır)
+TASK_DEPENDENCIES = MappingProxyType({
+    "check_course_registration": (
         {"task_type": "check_fee_status", "department": "finance"},
         {"task_type": "check_academic_status", "department": "academic_affairs"}
-    ],
-    "check_payment_status": [
-        {"task_type": "check_fee_status", "department": "finance"}
-    ],
-    "check_scholarship": [
-        {"task_type": "check_academic_status", "department": "academic_affairs"}
-    ]
-}
+    ),
+    "check_payment_status": (
+        {"task_type": "check_fee_status", "department": "finance"},
+    ),
+    "check_scholarship": (
+        {"task_type": "check_academic_status", "department": "academic_affairs"},
+    )
+})
 
 # Task type'lar için gerekli parametreler
 TASK_REQUIRED_PARAMS = {
@@ -103,6 +264,20 @@ TASK_REQUIRED_PARAMS = {
     "check_library_card": ["student_id"]  # Kişisel bilgi için
 }
 
+# Parametre varlık kontrolleri: (öğrenci no, data) -> parametre mevcut mu?
+# Username/email kontrolleri şimdilik basit.
+_PARAM_CHECKERS = {
+    "student_id": lambda student_id, data: bool(student_id),
+    "username": lambda student_id, data: bool(data and data.get("username")),
+    "email": lambda student_id, data: bool(data and data.get("email"))
+}
+
+
+def _param_always_present(student_id: Optional[str], data: Optional[Dict[str, Any]]) -> bool:
+    """Kontrolü tanımlı olmayan parametreler mevcut sayılır."""
+    return True
+
+
 # Parametre isimleri (kullanıcıya sorulurken)
 PARAM_DISPLAY_NAMES = {
     "student_id": "öğrenci numarası",
@@ -111,6 +286,236 @@ PARAM_DISPLAY_NAMES = {
 }
 
 
+# _analyze_by_llm prompt şablonu. Sabit metin modül yüklenirken bir kez
+# oluşturulur; her çağrıda yalnızca sorgu ve ek veri araya eklenir.
+_LLM_ANALYSIS_INSTRUCTIONS = """
+
+Bu isteği DETAYLICA ANALİZ ET ve hangi departmanların hangi işlemleri yapması gerektiğini belirle.
+Soruyu anlamak için bağlamı dikkate al:
+- "Öğrenciler ne yer?" → Yemekhane/kafeterya bilgisi → student_affairs departmanı
+- "Kütüphane kuralları?" → Kütüphane bilgisi → library departmanı
+- "Harç borcum var mı?" → Mali durum → finance departmanı
+- "Ders kaydı yapabilir miyim?" → Kayıt işlemi → student_affairs departmanı
+
+ÖNEMLİ: Departman adlarını MUTLAKA İNGİLİZCE olarak yaz (Türkçe değil!):
+- "it" (IT/Bilgi İşlem departmanı için - şifre, e-posta, teknik destek)
+- "student_affairs" (Öğrenci İşleri için - kayıt, belge, yemekhane, yurt, kampüs bilgileri)
+- "finance" (Mali İşler için - harç, burs, ödeme)
+- "academic_affairs" (Akademik İşler için - notlar, akademik durum, mezuniyet)
+- "library" (Kütüphane için - kitap, kütüphane kuralları, ödünç alma)
+
+Mevcut departmanlar ve görev tipleri:
+- IT (it): password_reset, tech_support, email_support, query
+- Öğrenci İşleri (student_affairs): check_course_registration, student_registration, query
+  → Ayrıca: yemekhane, kafeterya, yurt, kampüs, ulaşım gibi genel bilgiler için "query" kullan
+- Mali İşler (finance): check_fee_status, check_payment_status, check_scholarship, query
+- Akademik İşler (academic_affairs): check_academic_status, query
+- Kütüphane (library): search_book, check_library_card, query
+
+ÖNEMLİ KURALLAR:
+1. "department" alanını MUTLAKA İngilizce yaz: "it", "student_affairs", "finance", "academic_affairs", "library"
+2. "kurallar", "prosedür", "nasıl yapılır", "öğrenebilir miyim", "ne yer", "ne içer", "nerede" gibi sorular için "query" task_type kullan
+3. "silebilir miyim", "yapabilir miyim" gibi sorular için uygun task_type belirle
+4. "query" alanında kullanıcının tam sorusunu kopyala (değiştirme)
+5. Yemekhane, kafeterya, yurt, kampüs gibi genel bilgiler için "student_affairs" departmanını kullan
+
+ÖNEMLİ: Eğer kullanıcı BİRDEN FAZLA soru soruyorsa, HER SORU İÇİN AYRI TASK OLUŞTUR!
+
+ÇOKLU SORU TESPİTİ (Her türlü çoklu soru için geçerli):
+- Birden fazla "?" işareti varsa → Çoklu soru
+- "ayrıca", "ve", "ile", "hem", "hem de", "bir de", "aynı zamanda", "bunun yanında" gibi bağlaçlar varsa → Çoklu soru
+- Farklı konular hakkında sorular varsa → Çoklu soru (ör: borç + ders kaydı + burs + not ortalaması)
+- Farklı departmanları ilgilendiren sorular varsa → Çoklu soru
+
+TEK SORU ÖRNEKLERİ:
+- "Öğrenciler ne yer?" → "Mesela bu anlamsız bir soru departmanlar bu soruyla alakalı değil bağlamda bilgi bulunamadı cevabı dönmelisin"
+- "Kütüphane kuralları nelerdir?" → {"department": "library", "task_type": "query", "query": "Kütüphane kuralları nelerdir?"}
+- "Harç borcum var mı?" → {"department": "finance", "task_type": "check_fee_status", "query": "Harç borcum var mı?"}
+
+ÇOKLU SORU ÖRNEKLERİ (Pattern Öğrenme İçin - Bu örnekler sadece pattern gösterir, benzer tüm sorular için geçerlidir):
+- "Borç durumum nedir? Bu borç ders kaydı yapmamı engeller mi? Ayrıca not ortalamamla burs başvurusu yapabilir miyim?" → 
+  [
+    {"department": "finance", "task_type": "check_fee_status", "query": "Borç durumum nedir?", "priority": 1},
+    {"department": "student_affairs", "task_type": "check_course_registration", "query": "Bu borç ders kaydı yapmamı engeller mi?", "priority": 2, "depends_on": [{"task_type": "check_fee_status", "department": "finance"}]},
+    {"department": "academic_affairs", "task_type": "check_academic_status", "query": "Not ortalamam kaç?", "priority": 1},
+    {"department": "finance", "task_type": "check_scholarship", "query": "Not ortalamamla burs başvurusu yapabilir miyim?", "priority": 3, "depends_on": [{"task_type": "check_academic_status", "department": "academic_affairs"}]}
+  ]
+
+- "Ders kaydı yapabilir miyim? Not ortalamam kaç?" →
+  [
+    {"department": "student_affairs", "task_type": "check_course_registration", "query": "Ders kaydı yapabilir miyim?", "priority": 1},
+    {"department": "academic_affairs", "task_type": "check_academic_status", "query": "Not ortalamam kaç?", "priority": 1}
+  ]
+
+GENEL KURALLAR (TÜM ÇOKLU SORULAR İÇİN - Örneklerden bağımsız):
+1. Soruları parçala: Her soru için ayrı task oluştur
+2. Departman tespiti: Her sorunun hangi departmana ait olduğunu belirle
+3. Task type tespiti: Her sorunun hangi task_type'a ait olduğunu belirle (check_fee_status, check_course_registration, check_academic_status, check_scholarship, query, vb.)
+4. Bağımlılık tespiti:
+   - Ders kaydı için → önce borç kontrolü (check_fee_status) ve akademik durum (check_academic_status) gerekli
+   - Burs başvurusu için → önce akademik durum (check_academic_status) gerekli
+   - Ödeme durumu için → önce borç kontrolü (check_fee_status) gerekli
+5. "depends_on" formatı: [{"task_type": "check_fee_status", "department": "finance"}]
+6. Priority: Önce çalışması gerekenler 1, sonra çalışacaklar 2, 3...
+7. Query alanı: Her task'ın "query" alanına o spesifik soruyu yaz (tüm soruyu değil, sadece o task'a ait kısmı)
+
+JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
+{
+    "analysis": "İsteğin kısa analizi",
+    "tasks": [
+        {
+            "department": "student_affairs",
+            "task_type": "query",
+            "query": \""""
+_LLM_ANALYSIS_TAIL = """\",
+            "priority": 3,
+            "depends_on": []
+        }
+    ]
+}"""
+
+
+def _find_balanced_json(text: str) -> Optional[str]:
+    """
+    Metindeki dengeli üst seviye JSON nesnesini tek geçişte bulur.
+
+    Yalnızca {, }, " ve \\ karakterlerinde durulur; string içindeki
+    parantezler sayılmaz. Markdown code block çitleri parantez içermediği
+    için ayrıca ele alınmaz. "tasks" anahtarı içeren ilk nesne tercih edilir,
+    yoksa ilk dengeli nesne döndürülür.
+    """
+    first = None
+    depth = 0
+    start = -1
+    in_string = False
+    skip_until = -1
+
+    for match in _JSON_SPECIAL_RE.finditer(text):
+        pos = match.start()
+        if pos < skip_until:
+            continue
+        char = match.group()
+
+        if in_string:
+            if char == "\\":
+                skip_until = pos + 2
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            if depth:
+                in_string = True
+        elif char == "{":
+            if depth == 0:
+                start = pos
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                candidate = text[start:pos + 1]
+                if '"tasks"' in candidate:
+                    return candidate
+                if first is None:
+                    first = candidate
+
+    return first
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """
+    JSON metnindeki } veya ] öncesi fazladan virgülleri tek geçişte kaldırır.
+
+    Yalnızca virgül, " ve \\ karakterlerinde durulur; string içindeki
+    virgüllere dokunulmaz.
+    """
+    parts = []
+    copied = 0
+    in_string = False
+    skip_until = -1
+
+    for match in _JSON_COMMA_SCAN_RE.finditer(text):
+        pos = match.start()
+        if pos < skip_until:
+            continue
+        char = match.group()
+
+        if char == "\\":
+            skip_until = pos + 2
+        elif char == '"':
+            in_string = not in_string
+        elif not in_string and _CLOSING_BRACKET_RE.match(text, pos + 1):
+            parts.append(text[copied:pos])
+            copied = pos + 1
+
+    if not parts:
+        return text
+    parts.append(text[copied:])
+    return "".join(parts)
+
+
+def _plan_json_complete() -> Callable[[str], bool]:
+    """
+    Akışlı LLM analizinde "tasks" içeren JSON nesnesi tamamlanınca True
+    dönen koşulu üretir. Tarama yalnızca yeni gelen kısımda "}" varsa yapılır.
+    """
+    checked = 0
+
+    def complete(text: str) -> bool:
+        nonlocal checked
+        has_new_close = "}" in text[checked:]
+        checked = len(text)
+        if not has_new_close:
+            return False
+        candidate = _find_balanced_json(text)
+        return candidate is not None and '"tasks"' in candidate
+
+    return complete
+
+
+def _bulk_uuids(n: int) -> List[str]:
+    """n adet rastgele (version 4) UUID'yi tek os.urandom çağrısıyla üretir."""
+    buf = os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=buf[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
+
+async def _capture_exception(coro: Any) -> Any:
+    """Coroutine sonucunu, hata olursa istisna nesnesini döndürür."""
+    try:
+        return await coro
+    except Exception as e:
+        return e
+
+
+def _coerce_priority(value: Any, default: int = 3) -> int:
+    """
+    LLM planındaki önceliği int'e çevirir. LLM "1" gibi metin veya null
+    döndürebilir; sayıya çevrilemeyen değerler varsayılan önceliği alır.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+@dataclass(slots=True)
+class PlanTask:
+    """Analiz planındaki tek görev (sabit alanlı kayıt)."""
+
+    task_id: Optional[str]
+    department: str
+    task_type: str
+    query: str
+    priority: int = 3
+    dependencies: Sequence[Dict[str, Any]] = ()
+    wave: int = 0
+    context_id: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Görevi dış API için (artifact, log) dict olarak döndürür."""
+        return asdict(self)
+
+
 class MainOrchestrator(BaseAgent):
     """
     Ana Orchestrator - Sistemin giriş noktası.
@@ -125,7 +530,8 @@ class MainOrchestrator(BaseAgent):
         self,
         llm_provider: Optional[LLMProvider] = None,
         rag_engine: Optional[RAGEngine] = None,
-        endpoint: str = "http://localhost:8000"
+        endpoint: str = "http://localhost:8000",
+        max_parallel_dispatch: int = 8
     ):
         super().__init__(
             agent_id="main_orchestrator",
@@ -139,12 +545,26 @@ class MainOrchestrator(BaseAgent):
 
         # Departman orchestrator'ları
         self._department_orchestrators: Dict[str, DepartmentOrchestrator] = {}
-        # Basit in-memory queue (Redis'e geçiş için aynı arayüz korunabilir)
-        self._queue = InMemoryQueue()
+        # Aynı sorgu imzası için hesaplanmış analiz planları: key -> (son geçerlilik, analiz)
+        self._analysis_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Normalize sorgu için LLM'in ürettiği planlar: key -> (son geçerlilik, plan)
+        self._plan_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Analiz ve sentez çağrılarında kullanılan sabit sistem promptu
+        self._system_prompt = SystemPrompts.MAIN_ORCHESTRATOR
+        # Eşzamanlı belirsiz sorguların LLM analizlerini sınırlı eşzamanlılıkla gönderir
+        self._llm_batcher = AsyncLLMBatcher(self.llm) if self.llm else None
         # Timeout / retry ayarları
         self._send_timeout = 10
         self._send_retries = 2
         self._send_backoff = 0.5
+        # Rol bazında ("analysis", "synthesis") gözlenen LLM gecikmeleri (saniye)
+        self._llm_latency_hist: Dict[str, deque] = {
+            "analysis": deque(maxlen=_LLM_LATENCY_WINDOW),
+            "synthesis": deque(maxlen=_LLM_LATENCY_WINDOW)
+        }
+        # Departmanlara aynı anda gönderilen görev sayısı sınırı
+        self._max_parallel_dispatch = max_parallel_dispatch
+        self._dispatch_sem = asyncio.Semaphore(self._max_parallel_dispatch or 8)
 
     def _get_skills(self) -> list[AgentSkill]:
         """Ana orchestrator yetenekleri."""
@@ -225,16 +645,12 @@ class MainOrchestrator(BaseAgent):
         # 1.5. Eksik parametreleri kontrol et
         missing_params = analysis.get("missing_params", {})
         if missing_params:
-            # Eksik parametreleri kullanıcıdan sor
-            missing_list = []
-            for task_type, params in missing_params.items():
-                for param in params:
-                    display_name = PARAM_DISPLAY_NAMES.get(param, param)
-                    missing_list.append(display_name)
-            
-            # Tekrarları kaldır
-            missing_list = list(set(missing_list))
-            missing_text = ", ".join(missing_list)
+            # Eksik parametreleri kullanıcıdan sor (tekrarsız, ilk görülme sırasıyla)
+            missing_text = ", ".join(dict.fromkeys(
+                PARAM_DISPLAY_NAMES.get(param, param)
+                for params in missing_params.values()
+                for param in params
+            ))
             
             response_text = f"İsteğinizi işlemek için şu bilgilere ihtiyacım var: {missing_text}.\n\nLütfen bu bilgileri belirtir misiniz? (Örnek: 'Öğrenci numaram 20220015' veya '20220015 numaralı öğrenci için')"
             
@@ -276,7 +692,7 @@ class MainOrchestrator(BaseAgent):
         artifact = self.create_artifact(
             name="task_details",
             content=json.dumps({
-                "analysis": analysis,
+                "analysis": {**analysis, "tasks": [t.as_dict() for t in analysis["tasks"]]},
                 "department_results": [
                     {
                         "department": r["department"],
@@ -285,7 +701,7 @@ class MainOrchestrator(BaseAgent):
                     }
                     for r in department_results
                 ]
-            }, ensure_ascii=False, indent=2)
+            }, ensure_ascii=False, separators=(",", ":"))
         )
 
         result = create_response(task, final_response)
@@ -308,94 +724,95 @@ class MainOrchestrator(BaseAgent):
         2. Bağımlılık tespiti ve otomatik ekleme
         3. Topological sort ile sıralama
         """
-        import uuid
-
+        cache_key = (
+            query.strip(),
+            bool(user_id),
+            tuple(sorted(data.keys())) if data else ()
+        )
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            expires_at, cached_analysis = cached
+            if expires_at > asyncio.get_event_loop().time():
+                self._analysis_cache.move_to_end(cache_key)
+                logger.info("analysis_cache_hit", query=query[:100], context_id=context_id)
+                return self._copy_analysis(cached_analysis)
+            del self._analysis_cache[cache_key]
+
+        cacheable = True
         query_lower = query.lower()
         tasks = []
-        detected_task_types = set()
 
-        # 1. Task tiplerini tespit et
-        for task_type, keywords in TASK_TYPE_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in query_lower:
-                    detected_task_types.add(task_type)
-                    break
+        # 1. Task tiplerini tespit et (tek geçişte)
+        detected_task_types = _TASK_TYPE_MATCHER.tags(query_lower)
 
         # 2. Her task için departman ve detayları belirle
-        task_to_department = {
-            "check_fee_status": "finance",
-            "check_course_registration": "student_affairs",
-            "check_academic_status": "academic_affairs",
-            "check_payment_status": "finance",
-            "password_reset": "it",
-            "check_scholarship": "finance",
-            "search_book": "library",
-            "check_library_card": "library"
-        }
-
+        task_ids = iter(_bulk_uuids(len(detected_task_types)))
         for task_type in detected_task_types:
-            department = task_to_department.get(task_type)
+            department = TASK_TO_DEPARTMENT.get(task_type)
             if department:
-                tasks.append({
-                    "task_id": str(uuid.uuid4()),
-                    "department": department,
-                    "task_type": task_type,
-                    "query": query,
-                    "priority": 3,
-                    "dependencies": []
-                })
+                tasks.append(PlanTask(
+                    task_id=next(task_ids),
+                    department=department,
+                    task_type=task_type,
+                    query=query
+                ))
 
         # 3. Hiç task tespit edilmediyse veya belirsizlik varsa LLM ile analiz et
-        if not tasks or self._is_query_ambiguous(query, detected_task_types):
+        if not tasks or self._is_query_ambiguous(query_lower, detected_task_types):
             # LLM ile daha iyi anlama
             if self.llm:
                 try:
                     llm_analysis = await self._analyze_by_llm(query, data, context_id=context_id)
+                    # Zaman aşımı / hata / parse edilemeyen yanıt sonrası üretilen
+                    # yedek plan önbelleğe alınmaz; sonraki istek LLM'i tekrar dener
+                    if llm_analysis.get("fallback"):
+                        cacheable = False
                     if llm_analysis.get("tasks"):
                         # LLM'in bulduğu task'ları kullan
                         tasks = []
+                        task_ids = iter(_bulk_uuids(len(llm_analysis["tasks"])))
                         for t in llm_analysis["tasks"]:
                             # Department adını normalize et (Türkçe → İngilizce)
                             dept = self._normalize_department_name(t.get("department", "student_affairs"))
-                            tasks.append({
-                                "task_id": str(uuid.uuid4()),
-                                "department": dept,
-                                "task_type": t.get("task_type", "query"),
-                                "query": t.get("query", query),
-                                "priority": t.get("priority", 3),
-                                "dependencies": t.get("depends_on", [])
-                            })
+                            tasks.append(PlanTask(
+                                task_id=next(task_ids),
+                                department=dept,
+                                task_type=t.get("task_type", "query"),
+                                query=t.get("query", query),
+                                priority=_coerce_priority(t.get("priority")),
+                                dependencies=t.get("depends_on", [])
+                            ))
                         logger.info("llm_analysis_used", 
                                   query=query[:100],
                                   tasks_found=len(tasks),
                                   context_id=context_id)
                 except Exception as e:
                     logger.warning("llm_analysis_failed", error=str(e), context_id=context_id)
+                    # Geçici LLM hatasının sonucu önbelleğe alınmaz
+                    cacheable = False
                     # Fallback: keyword-based
                     if not tasks:
-                        keyword_departments = self._analyze_by_keywords(query)
+                        keyword_departments = self._analyze_by_keywords(query_lower)
+                        task_ids = iter(_bulk_uuids(len(keyword_departments)))
                         for dept in keyword_departments:
-                            tasks.append({
-                                "task_id": str(uuid.uuid4()),
-                                "department": dept,
-                                "task_type": "query",
-                                "query": query,
-                                "priority": 3,
-                                "dependencies": []
-                            })
+                            tasks.append(PlanTask(
+                                task_id=next(task_ids),
+                                department=dept,
+                                task_type="query",
+                                query=query
+                            ))
             else:
                 # LLM yoksa keyword-based fallback
                 if not tasks:
-                    keyword_departments = self._analyze_by_keywords(query)
+                    keyword_departments = self._analyze_by_keywords(query_lower)
+                    task_ids = iter(_bulk_uuids(len(keyword_departments)))
                     for dept in keyword_departments:
-                        tasks.append({
-                            "task_id": str(uuid.uuid4()),
-                            "department": dept,
-                            "task_type": "query",
-                            "query": query,
-                            "priority": 3,
-                            "dependencies": []
-                        })
+                        tasks.append(PlanTask(
+                            task_id=next(task_ids),
+                            department=dept,
+                            task_type="query",
+                            query=query
+                        ))
 
         # 4. Bağımlılıkları tespit et ve otomatik ekle
         tasks = self._detect_and_add_dependencies(tasks, query, context_id=context_id)
@@ -411,65 +828,85 @@ class MainOrchestrator(BaseAgent):
         logger.info(
             "request_analyzed",
             detected_tasks=len(tasks),
-            task_types=[t["task_type"] for t in tasks],
+            task_types=[t.task_type for t in tasks],
             missing_params=missing_params,
             extracted_student_id=extracted_student_id,
             context_id=context_id
         )
 
-        return {
-            "analysis": f"Tespit edilen görevler: {', '.join([t['task_type'] for t in tasks])}",
+        analysis = {
+            "analysis": f"Tespit edilen görevler: {', '.join([t.task_type for t in tasks])}",
             "tasks": tasks,
             "missing_params": missing_params
         }
 
+        if cacheable:
+            self._analysis_cache[cache_key] = (
+                asyncio.get_event_loop().time() + _ANALYSIS_CACHE_TTL,
+                self._copy_analysis(analysis)
+            )
+            if len(self._analysis_cache) > _ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+
+        return analysis
+
+    def _copy_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analiz planının bağımsız bir kopyasını döndürür.
+
+        _distribute_tasks PlanTask nesnelerini değiştirdiği için önbellek ile
+        çağıran taraf aynı nesneleri paylaşmaz; her kopyada task_id yenilenir.
+        """
+        tasks = analysis["tasks"]
+        return {
+            **analysis,
+            "tasks": [
+                replace(task, task_id=task_id)
+                for task, task_id in zip(tasks, _bulk_uuids(len(tasks)))
+            ],
+            "missing_params": copy.deepcopy(analysis["missing_params"])
+        }
+
     def _detect_and_add_dependencies(
         self,
-        tasks: List[Dict[str, Any]],
+        tasks: List[PlanTask],
         query: str,
         context_id: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[PlanTask]:
         """
-        Task bağımlılıklarını otomatik tespit et ve eksik bağımlılıkları ekle.
+        Task bağımlılıklarını otomatik tespit et, eksik bağımlılıkları ekle ve
+        task'ları topolojik sıraya koy.
 
         Örnek: check_course_registration için check_fee_status ve
-        check_academic_status otomatik eklenir.
+        check_academic_status otomatik eklenir. Eklenen task'ların kendi
+        bağımlılıkları da aynı şekilde işlenir.
         """
-        import uuid
-
-        existing_task_types = {t["task_type"] for t in tasks}
+        existing_task_types = {t.task_type for t in tasks}
         new_tasks = []
+        pending = deque(tasks)
 
-        task_to_department = {
-            "check_fee_status": "finance",
-            "check_course_registration": "student_affairs",
-            "check_academic_status": "academic_affairs",
-            "check_payment_status": "finance",
-            "password_reset": "it",
-            "check_scholarship": "finance"
-        }
-
-        for task in tasks:
-            task_type = task["task_type"]
+        while pending:
+            task = pending.popleft()
+            task_type = task.task_type
 
             # Metadata'dan bağımlılıkları kontrol et
             if task_type in TASK_DEPENDENCIES:
                 dependencies = TASK_DEPENDENCIES[task_type]
-                task["dependencies"] = dependencies.copy()
+                task.dependencies = dependencies
 
                 # Eksik bağımlılıkları otomatik ekle
                 for dep in dependencies:
                     dep_task_type = dep["task_type"]
                     if dep_task_type not in existing_task_types:
-                        new_task = {
-                            "task_id": str(uuid.uuid4()),
-                            "department": dep["department"],
-                            "task_type": dep_task_type,
-                            "query": query,
-                            "priority": 2,  # Bağımlılıklar öncelikli
-                            "dependencies": []
-                        }
+                        new_task = PlanTask(
+                            task_id=None,  # aşağıda toplu atanır
+                            department=dep["department"],
+                            task_type=dep_task_type,
+                            query=query,
+                            priority=2  # Bağımlılıklar öncelikli
+                        )
                         new_tasks.append(new_task)
+                        pending.append(new_task)
                         existing_task_types.add(dep_task_type)
 
                         logger.info(
@@ -479,12 +916,70 @@ class MainOrchestrator(BaseAgent):
                             context_id=context_id
                         )
 
-        # Yeni task'ları başa ekle (önce çalışmaları için)
-        return new_tasks + tasks
+        for new_task, task_id in zip(new_tasks, _bulk_uuids(len(new_tasks))):
+            new_task.task_id = task_id
+
+        # Yeni task'lar başta olacak şekilde topolojik sırala
+        return self._topological_sort(new_tasks + tasks, context_id=context_id)
+
+    def _topological_sort(
+        self,
+        tasks: List[PlanTask],
+        context_id: Optional[str] = None
+    ) -> List[PlanTask]:
+        """
+        Task'ları Kahn algoritması ile bağımlılık sırasına koyar.
+
+        Her task'ın wave alanı atanır: bağımlılığı olmayanlar 0, diğerleri
+        en uzak bağımlılığının bir sonraki dalgası. Aynı dalgadaki task'lar
+        birbirinden bağımsızdır. Döngü varsa loglanır ve döngüdeki task'lar
+        son dalga olarak sona eklenir.
+        """
+        indices_by_type: Dict[str, List[int]] = {}
+        for i, task in enumerate(tasks):
+            indices_by_type.setdefault(task.task_type, []).append(i)
+
+        dependents: List[List[int]] = [[] for _ in tasks]
+        indegree = [0] * len(tasks)
+        for i, task in enumerate(tasks):
+            for dep in task.dependencies:
+                for j in indices_by_type.get(dep["task_type"], []):
+                    if j != i:
+                        dependents[j].append(i)
+                        indegree[i] += 1
+
+        waves = [0] * len(tasks)
+        ready = deque(i for i in range(len(tasks)) if indegree[i] == 0)
+        order = []
+        while ready:
+            i = ready.popleft()
+            order.append(i)
+            for k in dependents[i]:
+                waves[k] = max(waves[k], waves[i] + 1)
+                indegree[k] -= 1
+                if indegree[k] == 0:
+                    ready.append(k)
+
+        if len(order) != len(tasks):
+            cyclic = [i for i in range(len(tasks)) if indegree[i] > 0]
+            logger.error(
+                "dependency_cycle_detected",
+                task_types=[tasks[i].task_type for i in cyclic],
+                context_id=context_id
+            )
+            last_wave = max((waves[i] for i in order), default=-1) + 1
+            for i in cyclic:
+                waves[i] = last_wave
+            order.extend(cyclic)
+
+        for i in order:
+            tasks[i].wave = waves[i]
+
+        return [tasks[i] for i in order]
 
     def _check_required_params(
         self,
-        tasks: List[Dict[str, Any]],
+        tasks: List[PlanTask],
         query: str,
         user_id: Optional[str] = None,
         data: Optional[Dict[str, Any]] = None
@@ -504,25 +999,14 @@ class MainOrchestrator(BaseAgent):
         effective_student_id = user_id
         
         for task in tasks:
-            task_type = task.get("task_type")
+            task_type = task.task_type
             if not task_type or task_type not in TASK_REQUIRED_PARAMS:
                 continue
             
-            required = TASK_REQUIRED_PARAMS[task_type]
-            missing = []
-            
-            for param in required:
-                if param == "student_id":
-                    if not effective_student_id:
-                        missing.append(param)
-                elif param == "username":
-                    # Username kontrolü (şimdilik basit)
-                    if not data or not data.get("username"):
-                        missing.append(param)
-                elif param == "email":
-                    # Email kontrolü (şimdilik basit)
-                    if not data or not data.get("email"):
-                        missing.append(param)
+            missing = [
+                param for param in TASK_REQUIRED_PARAMS[task_type]
+                if not _PARAM_CHECKERS.get(param, _param_always_present)(effective_student_id, data)
+            ]
             
             if missing:
                 missing_params[task_type] = missing
@@ -538,98 +1022,103 @@ class MainOrchestrator(BaseAgent):
         - "Öğrenci no: 20220015"
         - "20220015"
         """
-        # Öğrenci numarası genellikle 8-10 haneli sayı
-        # Pattern: 4 haneli yıl + 4-6 haneli numara
-        patterns = [
-            r'\b(\d{8})\b',  # 8 haneli: 20220015
-            r'\b(\d{10})\b',  # 10 haneli
-            r'öğrenci\s*(?:no|numarası|numara)?\s*:?\s*(\d{8,10})',
-            r'numara\s*:?\s*(\d{8,10})',
-            r'(\d{4})\s*\d{4,6}',  # Yıl + numara
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
-            if match:
-                student_id = match.group(1) if match.lastindex else match.group(0)
-                # 8-10 haneli sayı kontrolü
-                if len(student_id) >= 8 and len(student_id) <= 10:
-                    return student_id
-        
-        return None
+        match = _STUDENT_ID_RE.search(query)
+        return match.group(1) if match else None
 
-    def _analyze_by_keywords(self, query: str) -> List[str]:
-        """Anahtar kelime tabanlı departman tespiti."""
-        query_lower = query.lower()
-        matched_departments = []
-
-        for dept, keywords in DEPARTMENT_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in query_lower:
-                    if dept not in matched_departments:
-                        matched_departments.append(dept)
-                    break
-
-        return matched_departments if matched_departments else ["student_affairs"]
+    def _analyze_by_keywords(self, query_lower: str) -> List[str]:
+        """Anahtar kelime tabanlı departman tespiti (küçük harfli sorgu ile)."""
+        return _DEPARTMENT_MATCHER.ordered_tags(query_lower) or ["student_affairs"]
 
     def _normalize_department_name(self, dept: str) -> str:
         """
         Departman adını normalize eder (Türkçe → İngilizce).
         LLM bazen Türkçe döndürebilir, sistem İngilizce bekliyor.
         """
-        dept_lower = dept.lower().strip()
-        
-        # Türkçe → İngilizce mapping
-        dept_mapping = {
-            "kütüphane": "library",
-            "kutuphane": "library",
-            "it": "it",
-            "bilgi işlem": "it",
-            "teknoloji": "it",
-            "öğrenci işleri": "student_affairs",
-            "ogrenci isleri": "student_affairs",
-            "mali işler": "finance",
-            "mali isler": "finance",
-            "akademik işler": "academic_affairs",
-            "akademik isler": "academic_affairs"
-        }
-        
-        # Mapping'de varsa döndür
-        if dept_lower in dept_mapping:
-            return dept_mapping[dept_lower]
-        
-        # Zaten İngilizce ise olduğu gibi döndür
-        valid_departments = ["it", "student_affairs", "finance", "academic_affairs", "library"]
-        if dept_lower in valid_departments:
-            return dept_lower
-        
-        # Bulunamazsa default
-        logger.warning("unknown_department_normalized", original=dept, normalized="student_affairs")
-        return "student_affairs"
+        normalized = _DEPT_NORMALIZATION.get(dept.lower().strip())
+        if normalized is None:
+            logger.warning("unknown_department_normalized", original=dept, normalized="student_affairs")
+            return "student_affairs"
+        return normalized
 
-    def _is_query_ambiguous(self, query: str, detected_task_types: set) -> bool:
+    def _is_query_ambiguous(self, query_lower: str, detected_task_types: set) -> bool:
         """
         Sorgunun belirsiz olup olmadığını kontrol eder.
         Belirsiz sorgular LLM ile analiz edilmeli.
+
+        query_lower: _analyze_request içinde bir kez küçültülmüş sorgu
         """
-        query_lower = query.lower()
-        
-        # Belirsizlik göstergeleri
-        ambiguous_indicators = [
-            "nasıl", "neden", "ne zaman", "nerede", "kim", "ne", "nedir",
-            "öğrenebilir miyim", "öğrenmek istiyorum", "bilgi almak",
-            "kurallar", "prosedür", "süreç", "nasıl yapılır",
-            "silebilir miyim", "yapabilir miyim", "edebilir miyim",
-            "ne yer", "ne içer", "ne yapılır", "ne yapabilirim",
-            "hangi", "hangisi", "nerelerde", "kimler"
-        ]
-        
-        # Belirsiz kelimeler varsa veya hiç task tespit edilmemişse
-        has_ambiguous = any(indicator in query_lower for indicator in ambiguous_indicators)
+        has_ambiguous = _AMBIGUOUS_RE.search(query_lower) is not None
         no_task_detected = len(detected_task_types) == 0
         
         return has_ambiguous or no_task_detected
 
+    def _get_adaptive_timeout(self, role: str, default: float) -> float:
+        """
+        Rolün son LLM gecikmelerinin p95 değerine göre timeout döndürür.
+
+        Sonuç max(_LLM_MIN_TIMEOUT, p95 * 1.5) olup varsayılanı aşmaz; yeterli
+        örnek yoksa varsayılan kullanılır.
+        """
+        hist = self._llm_latency_hist[role]
+        if len(hist) < _LLM_LATENCY_MIN_SAMPLES:
+            return default
+        p95 = sorted(hist)[int(0.95 * len(hist))]
+        return min(default, max(_LLM_MIN_TIMEOUT, p95 * _LLM_TIMEOUT_P95_FACTOR))
+
+    def _plan_cache_key(
+        self,
+        query: str,
+        data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Tuple]:
+        """
+        LLM plan önbelleği anahtarı: küçük harfli, boşlukları sadeleştirilmiş
+        sorgu ve ek veri anahtarları. Rakam içeren sorgularda None döner.
+        """
+        if _DIGIT_RE.search(query):
+            return None
+        return (
+            _WHITESPACE_RE.sub(" ", query.strip().lower()),
+            tuple(sorted(data.keys())) if data else ()
+        )
+
+    def _classify_keywords(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Çoklu sorularda fallback anahtar kelimelerinden görev listesi çıkarır.
+        Tek soru veya eşleşme yoksa None döner.
+        """
+        if query.count("?") <= 1:
+            return None
+
+        tasks = []
+        for task_type in _LLM_FALLBACK_MATCHER.ordered_tags(query.lower()):
+            department, priority = _LLM_FALLBACK_TASKS[task_type]
+            tasks.append({
+                "department": department,
+                "task_type": task_type,
+                "query": query,
+                "priority": priority,
+                "depends_on": []
+            })
+        return tasks or None
+
+    def _keywords_cover_query(self, query: str, keyword_tasks: List[Dict[str, Any]]) -> bool:
+        """
+        _classify_keywords listesinin sorgunun tamamını kapsayıp kapsamadığını
+        döndürür: "?" ile ayrılan her soru en az bir göreve eşleşmeli ve ana
+        eşleştiricinin (_TASK_TYPE_MATCHER) bulduğu her görev tipi listede
+        olmalı. Kapsamıyorsa LLM analizi atlanmaz; aksi halde kapsam dışı
+        sorular (ör. kütüphane) plandan sessizce düşerdi.
+        """
+        query_lower = query.lower()
+        task_types = {task["task_type"] for task in keyword_tasks}
+        if not _TASK_TYPE_MATCHER.tags(query_lower) <= task_types:
+            return False
+        return all(
+            _LLM_FALLBACK_MATCHER.tags(question)
+            for question in query_lower.split("?")
+            if question.strip()
+        )
+
     async def _analyze_by_llm(
         self,
         query: str,
@@ -637,114 +1126,70 @@ class MainOrchestrator(BaseAgent):
         context_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """LLM ile detaylı analiz - karmaşık/ambiguos sorular için."""
-        prompt = f"""Kullanıcı isteği: "{query}"
-
-{f'Ek veri: {json.dumps(data, ensure_ascii=False)}' if data else ''}
-
-Bu isteği DETAYLICA ANALİZ ET ve hangi departmanların hangi işlemleri yapması gerektiğini belirle.
-Soruyu anlamak için bağlamı dikkate al:
-- "Öğrenciler ne yer?" → Yemekhane/kafeterya bilgisi → student_affairs departmanı
-- "Kütüphane kuralları?" → Kütüphane bilgisi → library departmanı
-- "Harç borcum var mı?" → Mali durum → finance departmanı
-- "Ders kaydı yapabilir miyim?" → Kayıt işlemi → student_affairs departmanı
-
-ÖNEMLİ: Departman adlarını MUTLAKA İNGİLİZCE olarak yaz (Türkçe değil!):
-- "it" (IT/Bilgi İşlem departmanı için - şifre, e-posta, teknik destek)
-- "student_affairs" (Öğrenci İşleri için - kayıt, belge, yemekhane, yurt, kampüs bilgileri)
-- "finance" (Mali İşler için - harç, burs, ödeme)
-- "academic_affairs" (Akademik İşler için - notlar, akademik durum, mezuniyet)
-- "library" (Kütüphane için - kitap, kütüphane kuralları, ödünç alma)
-
-Mevcut departmanlar ve görev tipleri:
-- IT (it): password_reset, tech_support, email_support, query
-- Öğrenci İşleri (student_affairs): check_course_registration, student_registration, query
-  → Ayrıca: yemekhane, kafeterya, yurt, kampüs, ulaşım gibi genel bilgiler için "query" kullan
-- Mali İşler (finance): check_fee_status, check_payment_status, check_scholarship, query
-- Akademik İşler (academic_affairs): check_academic_status, query
-- Kütüphane (library): search_book, check_library_card, query
-
-ÖNEMLİ KURALLAR:
-1. "department" alanını MUTLAKA İngilizce yaz: "it", "student_affairs", "finance", "academic_affairs", "library"
-2. "kurallar", "prosedür", "nasıl yapılır", "öğrenebilir miyim", "ne yer", "ne içer", "nerede" gibi sorular için "query" task_type kullan
-3. "silebilir miyim", "yapabilir miyim" gibi sorular için uygun task_type belirle
-4. "query" alanında kullanıcının tam sorusunu kopyala (değiştirme)
-5. Yemekhane, kafeterya, yurt, kampüs gibi genel bilgiler için "student_affairs" departmanını kullan
-
-ÖNEMLİ: Eğer kullanıcı BİRDEN FAZLA soru soruyorsa, HER SORU İÇİN AYRI TASK OLUŞTUR!
-
-ÇOKLU SORU TESPİTİ (Her türlü çoklu soru için geçerli):
-- Birden fazla "?" işareti varsa → Çoklu soru
-- "ayrıca", "ve", "ile", "hem", "hem de", "bir de", "aynı zamanda", "bunun yanında" gibi bağlaçlar varsa → Çoklu soru
-- Farklı konular hakkında sorular varsa → Çoklu soru (ör: borç + ders kaydı + burs + not ortalaması)
-- Farklı departmanları ilgilendiren sorular varsa → Çoklu soru
-
-TEK SORU ÖRNEKLERİ:
-- "Öğrenciler ne yer?" → "Mesela bu anlamsız bir soru departmanlar bu soruyla alakalı değil bağlamda bilgi bulunamadı cevabı dönmelisin"
-- "Kütüphane kuralları nelerdir?" → {{"department": "library", "task_type": "query", "query": "Kütüphane kuralları nelerdir?"}}
-- "Harç borcum var mı?" → {{"department": "finance", "task_type": "check_fee_status", "query": "Harç borcum var mı?"}}
-
-ÇOKLU SORU ÖRNEKLERİ (Pattern Öğrenme İçin - Bu örnekler sadece pattern gösterir, benzer tüm sorular için geçerlidir):
-- "Borç durumum nedir? Bu borç ders kaydı yapmamı engeller mi? Ayrıca not ortalamamla burs başvurusu yapabilir miyim?" → 
-  [
-    {{"department": "finance", "task_type": "check_fee_status", "query": "Borç durumum nedir?", "priority": 1}},
-    {{"department": "student_affairs", "task_type": "check_course_registration", "query": "Bu borç ders kaydı yapmamı engeller mi?", "priority": 2, "depends_on": [{{"task_type": "check_fee_status", "department": "finance"}}]}},
-    {{"department": "academic_affairs", "task_type": "check_academic_status", "query": "Not ortalamam kaç?", "priority": 1}},
-    {{"department": "finance", "task_type": "check_scholarship", "query": "Not ortalamamla burs başvurusu yapabilir miyim?", "priority": 3, "depends_on": [{{"task_type": "check_academic_status", "department": "academic_affairs"}}]}}
-  ]
-
-- "Ders kaydı yapabilir miyim? Not ortalamam kaç?" →
-  [
-    {{"department": "student_affairs", "task_type": "check_course_registration", "query": "Ders kaydı yapabilir miyim?", "priority": 1}},
-    {{"department": "academic_affairs", "task_type": "check_academic_status", "query": "Not ortalamam kaç?", "priority": 1}}
-  ]
-
-GENEL KURALLAR (TÜM ÇOKLU SORULAR İÇİN - Örneklerden bağımsız):
-1. Soruları parçala: Her soru için ayrı task oluştur
-2. Departman tespiti: Her sorunun hangi departmana ait olduğunu belirle
-3. Task type tespiti: Her sorunun hangi task_type'a ait olduğunu belirle (check_fee_status, check_course_registration, check_academic_status, check_scholarship, query, vb.)
-4. Bağımlılık tespiti:
-   - Ders kaydı için → önce borç kontrolü (check_fee_status) ve akademik durum (check_academic_status) gerekli
-   - Burs başvurusu için → önce akademik durum (check_academic_status) gerekli
-   - Ödeme durumu için → önce borç kontrolü (check_fee_status) gerekli
-5. "depends_on" formatı: [{{"task_type": "check_fee_status", "department": "finance"}}]
-6. Priority: Önce çalışması gerekenler 1, sonra çalışacaklar 2, 3...
-7. Query alanı: Her task'ın "query" alanına o spesifik soruyu yaz (tüm soruyu değil, sadece o task'a ait kısmı)
-
-JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
-{{
-    "analysis": "İsteğin kısa analizi",
-    "tasks": [
-        {{
-            "department": "student_affairs",
-            "task_type": "query",
-            "query": "{query}",
-            "priority": 3,
-            "depends_on": []
-        }}
-    ]
-}}"""
+        # Anahtar kelimeler yeterince belirleyiciyse LLM round-trip'ine gerek yok
+        keyword_tasks = self._classify_keywords(query)
+        if (
+            keyword_tasks
+            and len(keyword_tasks) >= _KEYWORD_SHORT_CIRCUIT_MIN_TASKS
+            and self._keywords_cover_query(query, keyword_tasks)
+        ):
+            logger.info("llm_analysis_skipped_by_keywords",
+                      tasks_count=len(keyword_tasks),
+                      context_id=context_id)
+            return {
+                "analysis": "Keyword-based task tespiti",
+                "tasks": keyword_tasks
+            }
 
+        plan_key = self._plan_cache_key(query, data)
+        if plan_key is not None:
+            cached = self._plan_cache.get(plan_key)
+            if cached is not None:
+                expires_at, plan = cached
+                if expires_at > asyncio.get_event_loop().time():
+                    self._plan_cache.move_to_end(plan_key)
+                    logger.info("llm_plan_cache_hit", query=query[:100], context_id=context_id)
+                    return copy.deepcopy(plan)
+                del self._plan_cache[plan_key]
+
+        data_line = f"Ek veri: {json.dumps(data, ensure_ascii=False)}" if data else ""
+        prompt = "".join((
+            'Kullanıcı isteği: "', query, '"\n\n',
+            data_line,
+            _LLM_ANALYSIS_INSTRUCTIONS, query, _LLM_ANALYSIS_TAIL
+        ))
+
+        # LLM analizi için timeout (kuyrukta bekleme dahil)
+        timeout = self._get_adaptive_timeout("analysis", 30.0)
+        llm_start = asyncio.get_event_loop().time()
         try:
             response = await asyncio.wait_for(
-                self.llm.generate(
+                self._llm_batcher.submit(
                     prompt=prompt,
-                    system_prompt=SystemPrompts.MAIN_ORCHESTRATOR,
-                    max_tokens=2000  # Task analizi için yeterli
+                    system_prompt=self._system_prompt,
+                    max_tokens=2000,  # Task analizi için yeterli
+                    # Plan JSON'u kapanınca kalan token'lar beklenmez
+                    stop_when=_plan_json_complete()
                 ),
-                timeout=30.0  # LLM analizi için timeout
+                timeout=timeout
             )
-            
+            self._llm_latency_hist["analysis"].append(asyncio.get_event_loop().time() - llm_start)
+
             logger.debug("llm_analysis_response_received", 
                         response_length=len(response),
                         response_preview=response[:200],
                         context_id=context_id)
         except asyncio.TimeoutError:
+            # Zaman aşımı da gözlem sayılır; p95 yükselir ve timeout genişler
+            self._llm_latency_hist["analysis"].append(timeout)
             logger.warning("llm_analysis_timeout", 
                          query=query[:100],
+                         timeout=timeout,
                          context_id=context_id)
             # Fallback
             return {
                 "analysis": "LLM analizi zaman aşımına uğradı",
+                "fallback": True,
                 "tasks": [{
                     "department": "student_affairs",
                     "task_type": "query",
@@ -762,6 +1207,7 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
             # Fallback
             return {
                 "analysis": f"LLM analizi hatası: {str(e)}",
+                "fallback": True,
                 "tasks": [{
                     "department": "student_affairs",
                     "task_type": "query",
@@ -772,56 +1218,9 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
             }
 
         # JSON parse - daha güçlü parsing
-        def fix_json_string(json_str: str) -> str:
-            """JSON string'ini düzeltmeye çalışır."""
-            # Trailing comma'ları kaldır
-            json_str = re.sub(r',\s*}', '}', json_str)
-            json_str = re.sub(r',\s*]', ']', json_str)
-            # Çift tırnak sorunlarını düzelt
-            json_str = re.sub(r'([^\\])"([^",:}\]]*)"([^",:}\]]*)"', r'\1"\2\3"', json_str)
-            return json_str
-        
-        def extract_json_from_text(text: str) -> Optional[str]:
-            """Metinden JSON bloğunu çıkarır."""
-            # Markdown code block - greedy match kullan (non-greedy değil)
-            json_match = re.search(r'```(?:json)?\s*(\{[\s\S]*\})\s*```', text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-                # JSON'un tamamını almak için balanced braces kontrolü yap
-                return json_str
-            
-            # Sadece JSON bloğu (tasks içeren) - greedy match
-            json_match = re.search(r'\{[\s\S]*?"tasks"[\s\S]*\}', text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                # Balanced braces kontrolü
-                brace_count = json_str.count('{') - json_str.count('}')
-                if brace_count == 0:
-                    return json_str
-                # Eksik braces varsa, sonuna kadar ekle
-                if brace_count > 0:
-                    # En son } bul ve ondan sonrasını ekle
-                    last_brace = text.rfind('}', json_match.end())
-                    if last_brace > json_match.end():
-                        return text[json_match.start():last_brace+1]
-            
-            # En dıştaki {} bloğu - balanced braces ile
-            start_idx = text.find('{')
-            if start_idx != -1:
-                brace_count = 0
-                for i in range(start_idx, len(text)):
-                    if text[i] == '{':
-                        brace_count += 1
-                    elif text[i] == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            return text[start_idx:i+1]
-            
-            return None
-        
         try:
             # Önce JSON'u metinden çıkar
-            json_str = extract_json_from_text(response)
+            json_str = _find_balanced_json(response)
             if not json_str:
                 logger.warning("llm_analysis_no_json_found", 
                              response_preview=response[:500],
@@ -830,15 +1229,19 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
             
             # JSON'u parse etmeyi dene
             try:
-                parsed = json.loads(json_str)
+                parsed = _json_loads(json_str)
             except json.JSONDecodeError as e:
                 # JSON hatalı, düzeltmeyi dene
                 logger.debug("llm_analysis_json_fixing_attempt",
                            error=str(e),
                            context_id=context_id)
-                fixed_json = fix_json_string(json_str)
+                # Önce trailing comma'ları kaldır, olmazsa çift tırnak sezgisini de uygula
+                fixed_json = _strip_trailing_commas(json_str)
                 try:
-                    parsed = json.loads(fixed_json)
+                    try:
+                        parsed = _json_loads(fixed_json)
+                    except json.JSONDecodeError:
+                        parsed = _json_loads(_DOUBLE_QUOTE_FIX_RE.sub(r'\1"\2\3"', fixed_json))
                     logger.debug("llm_analysis_json_fixed",
                                context_id=context_id)
                 except json.JSONDecodeError:
@@ -860,6 +1263,14 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
             logger.info("llm_analysis_json_parsed_success",
                        tasks_count=tasks_count,
                        context_id=context_id)
+            # Yalnızca doğrulanmış planlar önbelleğe alınır (fallback'ler değil)
+            if plan_key is not None:
+                self._plan_cache[plan_key] = (
+                    asyncio.get_event_loop().time() + _PLAN_CACHE_TTL,
+                    copy.deepcopy(parsed)
+                )
+                if len(self._plan_cache) > _PLAN_CACHE_SIZE:
+                    self._plan_cache.popitem(last=False)
             return parsed
             
         except (json.JSONDecodeError, ValueError) as e:
@@ -879,66 +1290,21 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
                       response_preview=response[:1000] if response else "no_response",
                       context_id=context_id)
         
-        # Fallback: Basit keyword-based analiz yap
-        # Çoklu soru tespiti
-        question_count = query.count("?")
-        if question_count > 1:
-            # Çoklu soru var, keyword-based task'lar oluştur
-            tasks = []
-            query_lower = query.lower()
-            
-            # Borç durumu
-            if any(kw in query_lower for kw in ["borç", "borc", "harc", "harç"]):
-                tasks.append({
-                    "department": "finance",
-                    "task_type": "check_fee_status",
-                    "query": query,
-                    "priority": 1,
-                    "depends_on": []
-                })
-            
-            # Ders kaydı
-            if any(kw in query_lower for kw in ["ders kaydı", "ders kaydi", "kayıt", "kayit"]):
-                tasks.append({
-                    "department": "student_affairs",
-                    "task_type": "check_course_registration",
-                    "query": query,
-                    "priority": 2,
-                    "depends_on": []
-                })
-            
-            # Akademik durum / GPA
-            if any(kw in query_lower for kw in ["not ortalaması", "not ortalamasi", "gpa", "akademik durum"]):
-                tasks.append({
-                    "department": "academic_affairs",
-                    "task_type": "check_academic_status",
-                    "query": query,
-                    "priority": 1,
-                    "depends_on": []
-                })
-            
-            # Burs
-            if any(kw in query_lower for kw in ["burs", "burs başvurusu", "burs basvurusu"]):
-                tasks.append({
-                    "department": "finance",
-                    "task_type": "check_scholarship",
-                    "query": query,
-                    "priority": 3,
-                    "depends_on": []
-                })
-            
-            if tasks:
-                logger.info("llm_analysis_fallback_tasks_created",
-                          tasks_count=len(tasks),
-                          context_id=context_id)
-                return {
-                    "analysis": "Fallback: Keyword-based task tespiti",
-                    "tasks": tasks
-                }
-        
+        # Fallback: Basit keyword-based analiz yap (çoklu soru tespiti)
+        if keyword_tasks:
+            logger.info("llm_analysis_fallback_tasks_created",
+                      tasks_count=len(keyword_tasks),
+                      context_id=context_id)
+            return {
+                "analysis": "Fallback: Keyword-based task tespiti",
+                "fallback": True,
+                "tasks": keyword_tasks
+            }
+
         # Hiçbir şey bulunamazsa default
         return {
             "analysis": response[:200] if response else "LLM analizi başarısız",
+            "fallback": True,
             "tasks": [{
                 "department": "student_affairs",
                 "task_type": "query",
@@ -950,135 +1316,153 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
 
     async def _distribute_tasks(
         self,
-        tasks: List[Dict[str, Any]],
+        tasks: List[PlanTask],
         context_id: Optional[str] = None,
         parent_task_id: Optional[str] = None,
         user_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Görevleri topological sort ile sıralayarak dağıtır.
+        Görevleri bağımlılık grafiği üzerinde Kahn algoritmasıyla dağıtır.
 
-        Bağımlılıkları tamamlanmış görevler paralel çalıştırılır.
-        Bağımlı görevlere, bağımlılıklarının sonuçları iletilir.
+        Graf (indegree + ters kenarlar) bir kez kurulur. Bağımlılığı kalmayan
+        görevler hemen başlatılır; bir görev biter bitmez ona bağlı ve artık
+        hazır olan görevler, diğerlerinin bitmesi beklenmeden gönderilir.
+        Bağımlı görevlere, bağımlılıklarının sonuçları iletilir. Bir görev
+        beklenmedik bir istisna ile sonlanırsa ona bağlı görevler çalıştırılmaz.
         """
         results = []
         completed_tasks = {}  # task_type -> result mapping
-        remaining_tasks = tasks.copy()
+        aborted_task_types = set()
 
-        while remaining_tasks:
-            # Bağımlılıkları tamamlanmış task'ları bul
+        # Bağımlılık grafiği: görev başına bağımlılık tipleri, indegree ve
+        # task_type -> bağımlı görev index'leri
+        dep_types = [
+            {dep["task_type"] for dep in task.dependencies}
+            for task in tasks
+        ]
+        indegree = [len(types) for types in dep_types]
+        # Döngülerde tekrar tekrar okunan alanlar görev başına bir kez alınır
+        task_types = [task.task_type for task in tasks]
+        priorities = [task.priority for task in tasks]
+        dependents: Dict[str, List[int]] = {}
+        for index, types in enumerate(dep_types):
+            for dep_type in types:
+                dependents.setdefault(dep_type, []).append(index)
+
+        ready = deque(index for index, degree in enumerate(indegree) if degree == 0)
+
+        def complete(index: int, result_dict: Dict[str, Any]):
+            """Sonucu kaydeder ve bağımlılığı biten görevleri hazır kuyruğuna ekler."""
+            task_type = task_types[index]
+            results.append(result_dict)
+            completed_tasks[task_type] = result_dict
+            for dependent in dependents.pop(task_type, ()):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+
+        pending: Dict[asyncio.Task, int] = {}
+
+        def launch_ready():
+            """Hazır görevleri öncelik sırasıyla (1 = önce) başlatır."""
             ready_tasks = []
-            for task in remaining_tasks:
-                dependencies = task.get("dependencies", [])
-                if not dependencies:
-                    ready_tasks.append(task)
-                else:
-                    # Tüm bağımlılıklar tamamlandı mı?
-                    all_deps_completed = all(
-                        dep["task_type"] in completed_tasks
-                        for dep in dependencies
+            while ready:
+                index = ready.popleft()
+                if aborted_task_types.intersection(dep_types[index]):
+                    task_type = task_types[index]
+                    logger.warning(
+                        "task_skipped_dependency_failed",
+                        task_type=task_type,
+                        context_id=context_id
                     )
-                    if all_deps_completed:
-                        ready_tasks.append(task)
-
-            if not ready_tasks:
-                # Circular dependency veya hata
-                logger.error(
-                    "dependency_resolution_failed",
-                    remaining=[t["task_type"] for t in remaining_tasks]
-                )
-                for task in remaining_tasks:
-                    results.append({
-                        "department": task["department"],
+                    aborted_task_types.add(task_type)
+                    complete(index, {
+                        "department": tasks[index].department,
                         "status": "failed",
-                        "response": "Bağımlılık çözümlenemedi",
-                        "task_type": task["task_type"]
+                        "response": "Bağımlı olunan görev başarısız oldu",
+                        "task_type": task_type
                     })
-                break
-
-            # Ready task'ları kuyruk + paralel çalıştır
-            async def enqueue_ready_tasks():
-                for t in ready_tasks:
-                    # Task metadata'ya context_id ekle
-                    t["context_id"] = context_id
-                    await self._queue.enqueue(
-                        A2ATask(
-                            task_id=t["task_id"],
-                            context_id=context_id,
-                            from_agent=self.agent_id,
-                            to_agent=self._department_orchestrators[t["department"]].agent_id if t["department"] in self._department_orchestrators else "unknown",
-                            initial_message=create_message(
-                                role=MessageRole.USER,
-                                text=t.get("query", ""),
-                                data={
-                                    "task_type": t.get("task_type", "query"),
-                                    "dependency_results": {},
-                                    "parent_task_id": parent_task_id,
-                                    "user_id": user_id
-                                } if user_id else {
-                                    "task_type": t.get("task_type", "query"),
-                                    "dependency_results": {},
-                                    "parent_task_id": parent_task_id
-                                },
-                                context_id=context_id
-                            )
-                        ),
-                        priority=t.get("priority", 3)
-                    )
-
-            await enqueue_ready_tasks()
-
-            async def process_dequeued_task(q_task: A2ATask, original_task: Dict[str, Any]) -> Dict[str, Any]:
-                # Bağımlılık sonuçlarını parametrelere ekle
-                dependency_results = {}
-                for dep in original_task.get("dependencies", []):
-                    dep_type = dep["task_type"]
-                    if dep_type in completed_tasks:
-                        dependency_results[dep_type] = completed_tasks[dep_type]
-
-                # Gönder
-                return await self._send_to_department(
-                    department=original_task["department"],
-                    query=original_task["query"],
-                    task_type=original_task.get("task_type", "query"),
-                    context_id=context_id,
-                    parent_task_id=parent_task_id,
-                    dependency_results=dependency_results,
-                    user_id=user_id
-                )
-
-            dequeued_tasks = []
-            for _ in range(len(ready_tasks)):
-                dq = await self._queue.dequeue()
-                if dq:
-                    dequeued_tasks.append(dq)
-
-            parallel_results = await asyncio.gather(*[
-                process_dequeued_task(dq, rt) for dq, rt in zip(dequeued_tasks, ready_tasks)
-            ], return_exceptions=True)
-
-            for task, result in zip(ready_tasks, parallel_results):
-                if isinstance(result, Exception):
-                    result_dict = {
-                        "department": task["department"],
-                        "status": "failed",
-                        "response": str(result),
-                        "task_type": task["task_type"]
-                    }
                 else:
-                    result_dict = result
+                    ready_tasks.append(index)
+
+            ready_tasks.sort(key=priorities.__getitem__)
+            for index in ready_tasks:
+                task = tasks[index]
+                # Task metadata'ya context_id ekle
+                task.context_id = context_id
+                running = asyncio.create_task(_capture_exception(
+                    self._send_to_department(
+                        department=task.department,
+                        query=task.query,
+                        task_type=task_types[index],
+                        context_id=context_id,
+                        parent_task_id=parent_task_id,
+                        # Bağımlılık sonuçlarını parametrelere ekle (hepsi tamamlanmış durumda)
+                        dependency_results={
+                            dep_type: completed_tasks[dep_type]
+                            for dep_type in dep_types[index]
+                        },
+                        user_id=user_id
+                    )
+                ))
+                pending[running] = index
 
-                results.append(result_dict)
-                completed_tasks[task["task_type"]] = result_dict
-                remaining_tasks.remove(task)
+        try:
+            launch_ready()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in sorted(done, key=pending.get):
+                    index = pending.pop(finished)
+                    task = tasks[index]
+                    task_type = task_types[index]
+                    result = finished.result()
+                    if isinstance(result, Exception):
+                        result_dict = {
+                            "department": task.department,
+                            "status": "failed",
+                            "response": str(result),
+                            "task_type": task_type
+                        }
+                        aborted_task_types.add(task_type)
+                    else:
+                        result_dict = result
+
+                    complete(index, result_dict)
+
+                    logger.info(
+                        "task_completed",
+                        task_type=task_type,
+                        department=task.department,
+                        status=result_dict.get("status"),
+                        wave=task.wave,
+                        context_id=context_id
+                    )
 
-                logger.info(
-                    "task_completed",
-                    task_type=task["task_type"],
-                    department=task["department"],
-                    status=result_dict.get("status"),
-                    context_id=context_id
-                )
+                # Biten görevlerin serbest bıraktığı bağımlıları hemen gönder
+                launch_ready()
+        finally:
+            # Dağıtım iptal edilirse arka planda görev bırakma
+            for running in pending:
+                running.cancel()
+
+        # Kuyruk boşaldığı halde indegree'si sıfırlanmayan görevler:
+        # circular dependency veya planda olmayan bağımlılık
+        for index, degree in enumerate(indegree):
+            if degree <= 0:
+                continue
+            task = tasks[index]
+            logger.error(
+                "dependency_resolution_failed",
+                task_type=task.task_type,
+                context_id=context_id
+            )
+            aborted_task_types.add(task.task_type)
+            results.append({
+                "department": task.department,
+                "status": "failed",
+                "response": "Bağımlılık çözümlenemedi",
+                "task_type": task.task_type
+            })
 
         return results
 
@@ -1112,28 +1496,30 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
         try:
             send_start = asyncio.get_event_loop().time()
             # Task verilerini oluştur - user_id dahil
-            task_data = {"task_type": task_type}
-            if user_id:
-                task_data["user_id"] = user_id
+            task_data = {
+                "task_type": task_type,
+                **({"user_id": user_id} if user_id else {}),
+                **({"dependency_results": dependency_results} if dependency_results else {})
+            }
             if dependency_results:
-                task_data["dependency_results"] = dependency_results
                 logger.info(
                     "sending_with_dependencies",
                     department=department,
                     task_type=task_type,
-                        dependencies=list(dependency_results.keys()),
-                        context_id=context_id
+                    dependencies=list(dependency_results.keys()),
+                    context_id=context_id
                 )
 
-            result = await self.send_to_agent(
-                to_agent=orchestrator.agent_id,
-                text=query,
-                data=task_data,
-                context_id=context_id,
-                timeout=self._send_timeout,
-                max_retries=self._send_retries,
-                retry_backoff=self._send_backoff
-            )
+            async with self._dispatch_sem:
+                result = await self.send_to_agent(
+                    to_agent=orchestrator.agent_id,
+                    text=query,
+                    data=task_data,
+                    context_id=context_id,
+                    timeout=self._send_timeout,
+                    max_retries=self._send_retries,
+                    retry_backoff=self._send_backoff
+                )
 
             if result.status == TaskStatus.COMPLETED:
                 latency_ms = round((asyncio.get_event_loop().time() - send_start) * 1000, 2)
@@ -1144,13 +1530,14 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
                     latency_ms=latency_ms,
                     context_id=context_id
                 )
+                latest = result.get_latest_message()
                 return {
                     "department": department,
                     "status": "completed",
-                    "response": result.get_latest_message().get_text(),
+                    "response": latest.get_text(),
                     "task_type": task_type,
                     "artifacts": [a.model_dump() for a in result.artifacts],
-                    "data": result.get_latest_message().get_data()
+                    "data": latest.get_data()
                 }
             else:
                 return {
@@ -1242,17 +1629,25 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
                 # 4 departman yanıtı varsa, detaylı sentez için daha fazla token
                 num_departments = len(successful_results)
                 max_tokens = 4000 if num_departments >= 3 else 3000
-                timeout_seconds = 45.0 if num_departments >= 3 else 35.0
-                
-                llm_answer = await asyncio.wait_for(
-                    self.llm.generate(
-                        prompt=prompt,
-                        system_prompt=SystemPrompts.MAIN_ORCHESTRATOR,
-                        max_tokens=max_tokens
-                    ),
-                    timeout=timeout_seconds
+                timeout_seconds = self._get_adaptive_timeout(
+                    "synthesis", 45.0 if num_departments >= 3 else 35.0
                 )
-                final_text = self._remove_emojis(llm_answer) if llm_answer else self._format_simple_response(successful_results)
+
+                llm_start = asyncio.get_event_loop().time()
+                try:
+                    llm_answer = await asyncio.wait_for(
+                        self.llm.generate(
+                            prompt=prompt,
+                            system_prompt=self._system_prompt,
+                            max_tokens=max_tokens
+                        ),
+                        timeout=timeout_seconds
+                    )
+                except asyncio.TimeoutError:
+                    self._llm_latency_hist["synthesis"].append(timeout_seconds)
+                    raise
+                self._llm_latency_hist["synthesis"].append(asyncio.get_event_loop().time() - llm_start)
+                final_text = self._clean_llm_answer(llm_answer) if llm_answer else self._format_simple_response(successful_results)
                 logger.info("synthesis_llm_completed",
                            response_length=len(final_text),
                            context_id=context_id)
@@ -1269,12 +1664,25 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
                        context_id=context_id)
 
         # Uzunluk kontrolü
-        max_len = 3000
-        if len(final_text) > max_len:
-            final_text = final_text[:max_len] + "\n\n(Yanıt uzunluk sınırı nedeniyle kısaltıldı.)"
+        if len(final_text) > _MAX_RESPONSE_LEN:
+            final_text = final_text[:_MAX_RESPONSE_LEN] + "\n\n(Yanıt uzunluk sınırı nedeniyle kısaltıldı.)"
 
         return final_text
 
+    def _clean_llm_answer(self, text: str) -> str:
+        """
+        LLM yanıtından emojileri kaldırır.
+
+        Uzun yanıtlarda önce yalnızca sınır + pay kadarlık önek temizlenir;
+        temiz önek sınırı aşıyorsa kesilecek kuyruk hiç taranmaz.
+        """
+        limit = _MAX_RESPONSE_LEN + _TRUNCATE_SCAN_SLACK
+        if len(text) > limit:
+            cleaned = self._remove_emojis(text[:limit])
+            if len(cleaned) > _MAX_RESPONSE_LEN:
+                return cleaned
+        return self._remove_emojis(text)
+
     def _format_simple_response(self, results: List[Dict[str, Any]]) -> str:
         """Basit yanıt formatlama - LLM kullanmadan."""
         dept_names = {
@@ -1288,34 +1696,12 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
         if len(results) == 1:
             return self._remove_emojis(results[0]["response"])
 
-        parts = []
-        for result in results:
-            dept_name = dept_names.get(result["department"], result["department"])
-            response = self._remove_emojis(result["response"])
-            parts.append(f"[{dept_name}]\n{response}")
-
-        return "\n\n".join(parts)
-
-    def _remove_emojis(self, text: str) -> str:
-        """Metinden emojileri kaldırır."""
-        import re
-        # Emoji pattern - Unicode emoji ranges
-        emoji_pattern = re.compile(
-            "["
-            "\U0001F600-\U0001F64F"  # emoticons
-            "\U0001F300-\U0001F5FF"  # symbols & pictographs
-            "\U0001F680-\U0001F6FF"  # transport & map symbols
-            "\U0001F1E0-\U0001F1FF"  # flags
-            "\U00002702-\U000027B0"  # dingbats
-            "\U000024C2-\U0001F251"  # enclosed characters
-            "\U0001F900-\U0001F9FF"  # supplemental symbols
-            "\U0001FA00-\U0001FA6F"  # chess symbols
-            "\U0001FA70-\U0001FAFF"  # symbols extended-A
-            "\U00002600-\U000026FF"  # misc symbols
-            "]+",
-            flags=re.UNICODE
+        # Tüm yanıtların emojileri tek geçişte temizlenir
+        responses = self._remove_emojis_all([result["response"] for result in results])
+        return "\n\n".join(
+            f"[{dept_names.get(result['department'], result['department'])}]\n{response}"
+            for result, response in zip(results, responses)
         )
-        return emoji_pattern.sub('', text).strip()
 
     def _needs_response_synthesis(
         self,
@@ -1343,27 +1729,21 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
             return False
 
         # 2+ departman varsa, yanıtların ilişkili olup olmadığını kontrol et
-        query_lower = user_query.lower()
 
         # Bağımlılık içeren task'lar - sentez gerekli
-        tasks = analysis.get("tasks", [])
-        has_dependencies = any(
-            task.get("dependencies") and len(task.get("dependencies", [])) > 0
-            for task in tasks
-        )
-        if has_dependencies:
+        if any(task.dependencies for task in analysis.get("tasks", [])):
             logger.debug("synthesis_needed", reason="has_dependencies")
             return True
 
         # Çoklu soru işareti - kullanıcı birden fazla soru sormuş
-        if query_lower.count("?") >= 2:
+        if user_query.count("?") >= 2:
             logger.debug("synthesis_needed", reason="multiple_questions")
             return True
 
         # Bağlaçlar - kullanıcı birbiriyle ilişkili şeyler soruyor
-        connectors = [" ve ", " ile ", " hem ", " hem de ", " ayrıca ", " aynı zamanda "]
-        has_connector = any(conn in query_lower for conn in connectors)
-        if has_connector and len(unique_departments) >= 2:
+        # (küçük harfe çevirme yalnızca bu son kontrole kadar gelinirse yapılır)
+        query_lower = user_query.lower()
+        if _CONNECTORS_RE.search(query_lower) and len(unique_departments) >= 2:
             logger.debug("synthesis_needed", reason="connector_multiple_dept")
             return True
 
@@ -1379,7 +1759,8 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
     ) -> str:
         """
         Kullanıcı mesajını işler (basitleştirilmiş API).
-        Frontend entegrasyonu için kullanılır.
+        Frontend entegrasyonu için kullanılır. İstek boyunca öğrenci
+        sorguları agent'lar arasında önbellekten paylaşılır.
         """
         task = create_task(
             from_agent="user",
@@ -1389,6 +1770,7 @@ JSON formatında yanıt ver (sadece JSON, başka açıklama yok):
             context_id=context_id
         )
 
-        result = await self.handle_task(task)
+        with student_cache_scope():
+            result = await self.handle_task(task)
 
         return result.get_latest_message().get_text()
@@ -1,3 +1,15 @@
-from .settings import settings
+from .settings import get_settings
 
-__all__ = ["settings"]
+__all__ = ["get_settings", "settings"]
+
+# Alt modül import edilince paket üzerinde `settings` adı modüle bağlanır;
+# bu ad eskiden olduğu gibi Settings instance'ını göstermeli, o yüzden
+# kaldırılıp aşağıdaki __getattr__ ile tembel çözülür.
+globals().pop("settings", None)
+
+
+def __getattr__(name: str):
+    # settings ilk erişimde oluşturulur (bkz. config.settings.__getattr__)
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
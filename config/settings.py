@@ -2,14 +2,13 @@
 Uygulama ayarları - tüm konfigürasyonları merkezi olarak yönetir.
 """
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Callable, ClassVar, Dict, Mapping, Optional
 from pydantic import Field
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# .env dosyasını yükle
-load_dotenv()
 
 class Settings(BaseSettings):
     """Uygulama ayarları."""
@@ -47,51 +46,84 @@ class Settings(BaseSettings):
     # Database
     database_url: str = Field(default="sqlite:///./university.db", alias="DATABASE_URL")
 
-    # Paths
-    base_dir: Path = Path(__file__).parent.parent
-    data_dir: Path = base_dir / "data"
-    chroma_dir: Path = base_dir / "chroma_db"
+    # Paths (ClassVar: alan değil, modül yüklenirken bir kez çözülür)
+    base_dir: ClassVar[Path] = Path(__file__).resolve().parent.parent
+    data_dir: ClassVar[Path] = base_dir / "data"
+    chroma_dir: ClassVar[Path] = base_dir / "chroma_db"
 
-    class Config:
-        env_file = ".env"
-        extra = "ignore"
+    # frozen: ayarlar başlangıçtan sonra değişmez (llm_config önbelleği buna dayanır)
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
 
-    def get_llm_config(self) -> dict:
+    def get_llm_config(self) -> Mapping[str, Optional[str]]:
         """Aktif LLM provider konfigürasyonunu döndürür."""
-        if self.primary_llm_provider == "gemini" and self.google_api_key:
-            return {
-                "provider": "gemini",
-                "api_key": self.google_api_key,
-                "model": self.gemini_model
-            }
-        elif self.primary_llm_provider == "claude" and self.anthropic_api_key:
-            return {
-                "provider": "claude",
-                "api_key": self.anthropic_api_key,
-                "model": self.claude_model
-            }
-        elif self.primary_llm_provider == "ollama_qwen":
-            return {
-                "provider": "ollama_qwen",
-                "api_key": None,
-                "model": self.ollama_qwen_model,
-                "base_url": self.ollama_base_url,
-            }
-        # Fallback
-        if self.google_api_key:
-            return {
-                "provider": "gemini",
-                "api_key": self.google_api_key,
-                "model": self.gemini_model
-            }
-        if self.anthropic_api_key:
-            return {
-                "provider": "claude",
-                "api_key": self.anthropic_api_key,
-                "model": self.claude_model
-            }
+        return self.llm_config
+
+    @cached_property
+    def llm_config(self) -> Mapping[str, Optional[str]]:
+        """
+        Aktif LLM provider konfigürasyonu.
+        Ayarlar başlangıçtan sonra değişmediği için bir kez hesaplanır ve
+        salt okunur olarak paylaşılır.
+        """
+        return MappingProxyType(self._resolve_llm_config())
+
+    def _resolve_llm_config(self) -> dict:
+        """
+        Ayarlara göre provider konfigürasyonunu seçer.
+        Primary provider kullanılabiliyorsa yalnızca onun anahtarına bakılır;
+        diğer provider anahtarları sadece fallback durumunda okunur.
+        """
+        builder = _LLM_CONFIG_BUILDERS.get(self.primary_llm_provider)
+        config = builder(self) if builder else None
+        if config:
+            return config
+
+        # Fallback: API anahtarı tanımlı ilk bulut provider
+        for provider in _LLM_FALLBACK_ORDER:
+            config = _LLM_CONFIG_BUILDERS[provider](self)
+            if config:
+                return config
         return {"provider": "mock", "api_key": None, "model": None}
 
 
-# Singleton instance
-settings = Settings()
+# provider -> konfigürasyon üreticisi; gerekli anahtar yoksa None döner
+_LLM_CONFIG_BUILDERS: Dict[str, Callable[[Settings], Optional[dict]]] = {
+    "gemini": lambda s: {
+        "provider": "gemini",
+        "api_key": s.google_api_key,
+        "model": s.gemini_model
+    } if s.google_api_key else None,
+    "claude": lambda s: {
+        "provider": "claude",
+        "api_key": s.anthropic_api_key,
+        "model": s.claude_model
+    } if s.anthropic_api_key else None,
+    "ollama_qwen": lambda s: {
+        "provider": "ollama_qwen",
+        "api_key": None,
+        "model": s.ollama_qwen_model,
+        "base_url": s.ollama_base_url,
+    },
+}
+# Primary kullanılamazsa denenen provider'lar (local Ollama fallback değil)
+_LLM_FALLBACK_ORDER = ("gemini", "claude")
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Settings singleton'ı döndürür.
+    .env okuma ve doğrulama yalnızca ilk çağrıda yapılır; Settings() yerine
+    bu fonksiyon kullanılmalı.
+    """
+    return Settings()
+
+
+def __getattr__(name: str):
+    """
+    `settings` modül attribute'u geriye uyumluluk için tembel çözülür (PEP 562);
+    import sırasında .env okunmaz, ilk erişimde get_settings() çağrılır.
+    """
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,10 @@
-from .connection import DatabaseConnection, get_database
+from .connection import DatabaseConnection, get_database, student_cache_scope
 from .models import Student, Course, Tuition, Scholarship, ITTicket
-from .seed_data import seed_database
 
 __all__ = [
     "DatabaseConnection",
     "get_database",
+    "student_cache_scope",
     "Student",
     "Course",
     "Tuition",
@@ -12,3 +12,11 @@ __all__ = [
     "ITTicket",
     "seed_database"
 ]
+
+
+def __getattr__(name: str):
+    # seed_data yalnızca seed gerektiğinde yüklenir
+    if name == "seed_database":
+        from .seed_data import seed_database
+        return seed_database
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
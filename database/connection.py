@@ -1,14 +1,27 @@
 """
 Database Connection - Veritabanı bağlantısı ve sorgu metodları.
+
+Agent sorguları async engine (SQLite için aiosqlite) üzerinden çalışır ve
+event loop'u bloklamaz. Tablo oluşturma ve seed işlemleri başlangıçta bir
+kez çalıştığı için senkron engine'i kullanır.
 """
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import Integer, bindparam, create_engine, event, func, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload, selectinload, sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 import structlog
 
 from .models import (
-    Base, Student, Course, StudentCourse, Tuition, Payment,
+    Base, CodedString, Student, Course, StudentCourse, Tuition, Payment,
     Installment, Scholarship, ScholarshipApplication,
     AvailableScholarship, UserAccount, ITTicket, KnownIssue,
     Device, CourseRegistrationPeriod
@@ -16,6 +29,250 @@ from .models import (
 
 logger = structlog.get_logger()
 
+# SQLite bağlantısı açılırken uygulanan ayarlar: WAL ile okuyucular yazarı
+# beklemez, synchronous=NORMAL commit başına fsync maliyetini düşürür,
+# 64MB sayfa önbelleği ve mmap okuma sorgularını bellekte tutar.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_conn, _connection_record):
+    """Yeni SQLite bağlantısına performans pragmalarını uygular."""
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+# Senkron URL şemasına karşılık gelen async sürücüler
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def _to_async_url(database_url: str) -> str:
+    """Sürücü belirtilmemiş URL'yi async sürücülü karşılığına çevirir."""
+    scheme, sep, rest = database_url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+_SQLITE_MEMORY_URLS = ("sqlite://", "sqlite:///:memory:")
+
+# Sunucu tabanlı veritabanlarında havuz: ani yüklerde taşma bağlantıları,
+# kopmuş bağlantılar için checkout öncesi ping, sunucu tarafı zaman aşımından
+# önce bağlantı yenileme
+_SERVER_POOL_OPTIONS = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+}
+
+
+def _engine_options(database_url: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Engine URL'si ve pool ayarlarını döndürür.
+
+    Metodlar çağrı başına session açar; session ucuzdur, maliyet bağlantı
+    kurmaktır. Dosya tabanlı SQLite ve diğer veritabanlarında SQLAlchemy 2.x
+    varsayılanı QueuePool (async: AsyncAdaptedQueuePool) olduğundan bağlantılar
+    havuzdan tekrar kullanılır; sunucu tabanlı veritabanlarında havuz boyutu
+    ve bağlantı sağlığı _SERVER_POOL_OPTIONS ile ayarlanır. Bellek içi SQLite her bağlantıda boş bir
+    veritabanı açtığı için paylaşımlı önbellekli isimli bir bellek veritabanına
+    çevrilir ve StaticPool ile tek bağlantı açık tutulur; böylece senkron
+    (tablo/seed) ve async (agent) engine aynı veriyi görür.
+    """
+    if not database_url.startswith("sqlite"):
+        return database_url, dict(_SERVER_POOL_OPTIONS)
+
+    connect_args = {"check_same_thread": False}
+    if database_url in _SQLITE_MEMORY_URLS:
+        name = f"a2a_memdb_{uuid.uuid4().hex}"
+        return (
+            f"sqlite:///file:{name}?mode=memory&cache=shared&uri=true",
+            {"connect_args": connect_args, "poolclass": StaticPool}
+        )
+    return database_url, {"connect_args": connect_args}
+
+
+# psycopg2 ile executemany (seed) INSERT'leri satır başına round-trip yerine
+# çok satırlı VALUES sayfalarına toplanır
+_PSYCOPG2_SCHEMES = ("postgresql", "postgresql+psycopg2")
+_INSERTMANYVALUES_PAGE_SIZE = 1000
+
+
+def _batch_insert_options(database_url: str) -> Dict[str, Any]:
+    """Senkron engine için toplu INSERT ayarları (async sürücüler desteklemez)."""
+    if database_url.partition("://")[0] in _PSYCOPG2_SCHEMES:
+        return {
+            "executemany_mode": "values_plus_batch",
+            "insertmanyvalues_page_size": _INSERTMANYVALUES_PAGE_SIZE,
+        }
+    return {}
+
+
+# Sık kullanılan sorgular modül yüklenirken bir kez oluşturulur.
+# SQLAlchemy derlenmiş SQL'i önbellekte tutar, sqlite3 sürücüsü de aynı
+# SQL metni için hazırlanmış ifadeyi (prepared statement) yeniden kullanır.
+_STUDENT_BY_NUMBER = select(Student).where(
+    Student.student_id == bindparam("student_id")
+)
+# İlişkili kayıtları aynı round-trip'te getiren varyantlar (lazy load yok)
+_STUDENT_WITH_ACCOUNT = _STUDENT_BY_NUMBER.options(joinedload(Student.account))
+_STUDENT_WITH_TUITION = _STUDENT_BY_NUMBER.options(joinedload(Student.tuition))
+# Agent'ların birlikte istediği öğrenci verisinin tamamı (get_student_snapshot)
+_STUDENT_SNAPSHOT = _STUDENT_BY_NUMBER.options(
+    joinedload(Student.tuition),
+    joinedload(Student.account),
+    selectinload(Student.scholarships),
+    selectinload(Student.courses).joinedload(StudentCourse.course)
+)
+
+
+# Liste döndüren metodların satır -> sözlük dönüşümü. Sorgular yalnızca
+# gereken kolonları seçer (ORM nesnesi oluşturulmaz); seçilen kolon sırası
+# anahtar sırasıyla aynıdır ve her satır dict(zip(...)) ile tek adımda kurulur.
+# Tarihler strftime yerine isoformat ile biçimlenir: çıktı aynı (YYYY-MM-DD),
+# ama format metni her satırda yeniden ayrıştırılmaz.
+_COURSE_KEYS = ("code", "name", "credits", "instructor", "grade")
+_COURSE_COLUMNS = (
+    Course.course_code, Course.course_name, Course.credits,
+    Course.instructor, StudentCourse.grade
+)
+# Snapshot'ta dersler ORM ilişkisiyle geldiği için attrgetter kullanılır
+_ENROLLMENT_GET = attrgetter(
+    "course.course_code", "course.course_name", "course.credits",
+    "course.instructor", "grade"
+)
+_PAYMENT_KEYS = ("date", "amount", "method", "receipt")
+_PAYMENT_COLUMNS = (Payment.payment_date, Payment.amount, Payment.payment_method, Payment.receipt_no)
+_INSTALLMENT_KEYS = ("number", "amount", "due_date", "status")
+_INSTALLMENT_COLUMNS = (Installment.installment_number, Installment.amount, Installment.due_date, Installment.status)
+_APPLICATION_KEYS = ("scholarship_name", "application_date", "status")
+_APPLICATION_COLUMNS = (
+    ScholarshipApplication.scholarship_name,
+    ScholarshipApplication.application_date,
+    ScholarshipApplication.status
+)
+_AVAILABLE_SCHOLARSHIP_KEYS = ("name", "description", "amount", "min_gpa", "deadline")
+_AVAILABLE_SCHOLARSHIP_COLUMNS = (
+    AvailableScholarship.name, AvailableScholarship.description,
+    AvailableScholarship.monthly_amount, AvailableScholarship.min_gpa,
+    AvailableScholarship.deadline
+)
+_TICKET_KEYS = ("ticket_no", "subject", "status", "created_at")
+_TICKET_COLUMNS = (ITTicket.ticket_no, ITTicket.subject, ITTicket.status, ITTicket.created_at)
+_KNOWN_ISSUE_KEYS = ("title", "description", "solution")
+_KNOWN_ISSUE_COLUMNS = (KnownIssue.title, KnownIssue.description, KnownIssue.solution)
+_DEVICE_KEYS = ("type", "brand", "model", "serial")
+_DEVICE_COLUMNS = (Device.device_type, Device.brand, Device.model, Device.serial_no)
+
+
+# ORM nesnesi -> agent sözlüğü dönüşümleri; tekil metodlar ve snapshot
+# aynı yapıyı üretsin diye tek yerde tutulur.
+
+def _student_info_dict(student: Student) -> Dict[str, Any]:
+    return {
+        "id": student.id,
+        "student_id": student.student_id,
+        "full_name": student.full_name,
+        "email": student.email,
+        "department": student.department,
+        "faculty": student.faculty,
+        "grade": student.grade,
+        "enrollment_year": student.enrollment_year,
+        "registration_status": student.registration_status
+    }
+
+
+def _academic_status_dict(student: Student, current_credits: int) -> Dict[str, Any]:
+    # Max kredi (GANO'ya göre)
+    max_credits = 30
+    if student.gpa and student.gpa >= 3.0:
+        max_credits = 36
+    elif student.gpa and student.gpa >= 2.5:
+        max_credits = 33
+
+    return {
+        "gpa": student.gpa,
+        "total_credits": student.total_credits,
+        "completed_credits": student.completed_credits,
+        "current_semester": student.current_semester,
+        "current_credits": current_credits,
+        "max_credits": max_credits,
+        "grade": student.grade
+    }
+
+
+def _tuition_status_dict(tuition: Optional[Tuition]) -> Dict[str, Any]:
+    if not tuition:
+        return {"has_debt": False, "debt_amount": 0}
+
+    return {
+        "has_debt": tuition.has_debt,
+        "debt_amount": tuition.debt_amount,
+        "total_amount": tuition.total_amount,
+        "paid_amount": tuition.paid_amount,
+        "due_date": tuition.due_date.isoformat()[:10] if tuition.due_date else None,
+        "semester": tuition.semester
+    }
+
+
+def _scholarship_status_dict(scholarship: Optional[Scholarship]) -> Dict[str, Any]:
+    if not scholarship:
+        return {"active_scholarship": False}
+
+    return {
+        "active_scholarship": True,
+        "scholarship_name": scholarship.scholarship_name,
+        "scholarship_type": scholarship.scholarship_type,
+        "monthly_amount": scholarship.monthly_amount,
+        "start_date": scholarship.start_date.isoformat()[:10] if scholarship.start_date else None,
+        "end_date": scholarship.end_date.isoformat()[:10] if scholarship.end_date else None
+    }
+
+
+def _user_account_dict(account: UserAccount) -> Dict[str, Any]:
+    return {
+        "username": account.username,
+        "email": account.email,
+        "status": account.status,
+        "last_login": account.last_login.isoformat(sep=" ", timespec="minutes") if account.last_login else None,
+        "is_locked": account.is_locked
+    }
+
+
+# İstek kapsamlı öğrenci önbelleği: (student_id, sorgu) -> Student (veya None).
+# Bir kullanıcı isteği boyunca birden çok agent aynı öğrenciyi sorgular;
+# kapsam dışında (None) önbellek kullanılmaz. asyncio task'ları context'i
+# kopyaladığı için aynı istekte açılan alt task'lar aynı sözlüğü paylaşır.
+_request_student_cache: ContextVar[Optional[Dict[Tuple[str, int], Optional[Student]]]] = ContextVar(
+    "request_student_cache", default=None
+)
+_CACHE_MISS = object()
+
+
+@contextmanager
+def student_cache_scope() -> Iterator[None]:
+    """
+    Bir kullanıcı isteği süresince öğrenci sorgularını önbelleğe alır.
+    Kapsam bitince önbellek atılır; istekler arası veri paylaşılmaz.
+    """
+    token = _request_student_cache.set({})
+    try:
+        yield
+    finally:
+        _request_student_cache.reset(token)
+
 
 class DatabaseConnection:
     """
@@ -25,18 +282,87 @@ class DatabaseConnection:
 
     def __init__(self, database_url: str = "sqlite:///./university.db"):
         self.database_url = database_url
-        self.engine = create_engine(database_url, echo=False)
+        is_sqlite = database_url.startswith("sqlite")
+        engine_url, engine_options = _engine_options(database_url)
+        self.engine = create_engine(
+            engine_url, echo=False, **engine_options, **_batch_insert_options(engine_url)
+        )
         self.SessionLocal = sessionmaker(bind=self.engine)
 
+        # Agent sorguları için async engine
+        self.async_engine = create_async_engine(_to_async_url(engine_url), echo=False, **engine_options)
+        self.AsyncSessionLocal = async_sessionmaker(self.async_engine, expire_on_commit=False)
+
+        if is_sqlite:
+            event.listen(self.engine, "connect", _apply_sqlite_pragmas)
+            event.listen(self.async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
     def create_tables(self):
-        """Tabloları oluşturur."""
+        """Tabloları oluşturur ve mevcut şemanın modellerle uyumlu olduğunu doğrular."""
         Base.metadata.create_all(bind=self.engine)
+        self._check_schema()
         logger.info("database_tables_created")
 
+    def _check_schema(self):
+        """
+        create_all mevcut tabloları değiştirmez. Eski sürümle oluşturulmuş bir
+        veritabanında eksik kolonlar (ör. it_tickets.department) veya metin
+        olarak saklanan durum kolonları varsa sorgular sessizce yanlış sonuç
+        verir; bu durumda açık bir hata ile durulur.
+        """
+        inspector = sa_inspect(self.engine)
+        outdated = []
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    outdated.append(f"{table.name}.{column.name} (eksik)")
+                elif isinstance(column.type, CodedString) and not isinstance(existing[column.name], Integer):
+                    outdated.append(f"{table.name}.{column.name} (metin saklıyor)")
+
+        if outdated:
+            raise RuntimeError(
+                "Veritabanı şeması eski bir sürümden kalma: "
+                f"{', '.join(outdated)}. Veritabanı dosyasını silip uygulamayı "
+                "yeniden başlatın; tablolar ve örnek veriler yeniden oluşturulur."
+            )
+
     def get_session(self) -> Session:
-        """Yeni session döndürür."""
+        """Yeni senkron session döndürür (tablo oluşturma / seed için)."""
         return self.SessionLocal()
 
+    def get_async_session(self) -> AsyncSession:
+        """Yeni async session döndürür."""
+        return self.AsyncSessionLocal()
+
+    async def _fetch_student(
+        self,
+        session: AsyncSession,
+        student_id: str,
+        statement=_STUDENT_BY_NUMBER
+    ) -> Optional[Student]:
+        """
+        Öğrenci numarasına göre öğrenciyi hazır sorgu ile getirir.
+        statement ile ilişkileri eager-load eden varyant seçilebilir.
+        """
+        cache = _request_student_cache.get()
+        # Sorgu varyantları farklı ilişkileri yüklediği için anahtara dahil
+        key = (student_id, id(statement))
+        if cache is not None:
+            cached = cache.get(key, _CACHE_MISS)
+            if cached is not _CACHE_MISS:
+                return cached
+
+        result = await session.execute(statement, {"student_id": student_id})
+        # student_id unique; en fazla bir satır döner
+        student = result.scalar_one_or_none()
+
+        # Nesne session kapandıktan sonra da okunabilir (expire_on_commit=False);
+        # veri yazan metodlar eklenirse ilgili anahtarlar burada silinmeli.
+        if cache is not None:
+            cache[key] = student
+        return student
+
     # ==================== STUDENT ENTITY ====================
 
     async def get_student(self, student_id: str) -> Optional[Any]:
@@ -44,103 +370,111 @@ class DatabaseConnection:
         Öğrenci ORM nesnesini döndürür.
         AcademicStatusAgent gibi yerlerde doğrudan attribute erişimi için kullanılır.
         """
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            student = await self._fetch_student(session, student_id)
             return student
 
+    async def get_student_snapshot(self, student_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Öğrencinin bilgi, akademik durum, mevcut ders, harç, burs ve hesap
+        verilerini tek seferde döndürür.
+
+        Tekil metodlar her biri ayrı session ve sorgu açar; aynı öğrenci için
+        birkaç tanesine ihtiyaç duyan agent'lar bunun yerine bu metodu kullanır.
+        İlişkiler joinedload/selectinload ile tek round-trip grubunda gelir.
+        """
+        async with self.get_async_session() as session:
+            student = await self._fetch_student(session, student_id, _STUDENT_SNAPSHOT)
+
+            if not student:
+                return None
+
+            # Devam eden dersler kayıt sırasına göre (get_current_courses ile aynı)
+            enrollments = sorted(
+                (sc for sc in student.courses if sc.status == "Devam"),
+                key=lambda sc: sc.id
+            )
+            current_courses = [dict(zip(_COURSE_KEYS, _ENROLLMENT_GET(sc))) for sc in enrollments]
+            current_credits = sum(course["credits"] or 0 for course in current_courses)
+
+            active_scholarship = next(
+                (s for s in sorted(student.scholarships, key=lambda s: s.id) if s.status == "Aktif"),
+                None
+            )
+
+            return {
+                "student_info": _student_info_dict(student),
+                "academic_status": _academic_status_dict(student, current_credits),
+                "current_courses": current_courses,
+                "tuition_status": _tuition_status_dict(student.tuition),
+                "scholarship_status": _scholarship_status_dict(active_scholarship),
+                "user_account": _user_account_dict(student.account) if student.account else None
+            }
+
     # ==================== STUDENT QUERIES ====================
 
     async def get_student_info(self, student_id: str) -> Optional[Dict[str, Any]]:
         """Öğrenci bilgilerini döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            student = await self._fetch_student(session, student_id)
 
             if student:
-                return {
-                    "id": student.id,
-                    "student_id": student.student_id,
-                    "full_name": student.full_name,
-                    "email": student.email,
-                    "department": student.department,
-                    "faculty": student.faculty,
-                    "grade": student.grade,
-                    "enrollment_year": student.enrollment_year,
-                    "registration_status": student.registration_status
-                }
+                return _student_info_dict(student)
         return None
 
     async def get_academic_status(self, student_id: str) -> Optional[Dict[str, Any]]:
         """Akademik durum bilgilerini döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            student = await self._fetch_student(session, student_id)
 
             if student:
-                # Mevcut krediyi hesapla
-                current_courses = session.query(StudentCourse).filter(
-                    StudentCourse.student_id == student.id,
-                    StudentCourse.status == "Devam"
-                ).all()
-
-                current_credits = sum(
-                    session.query(Course).get(c.course_id).credits
-                    for c in current_courses
-                )
-
-                # Max kredi (GANO'ya göre)
-                max_credits = 30
-                if student.gpa and student.gpa >= 3.0:
-                    max_credits = 36
-                elif student.gpa and student.gpa >= 2.5:
-                    max_credits = 33
-
-                return {
-                    "gpa": student.gpa,
-                    "total_credits": student.total_credits,
-                    "completed_credits": student.completed_credits,
-                    "current_semester": student.current_semester,
-                    "current_credits": current_credits,
-                    "max_credits": max_credits,
-                    "grade": student.grade
-                }
+                # Mevcut krediyi hesapla (tek JOIN + SUM sorgusu)
+                current_credits = (await session.execute(
+                    select(func.coalesce(func.sum(Course.credits), 0))
+                    .select_from(Course)
+                    .join(StudentCourse, StudentCourse.course_id == Course.id)
+                    .where(
+                        StudentCourse.student_id == student.id,
+                        StudentCourse.status == "Devam"
+                    )
+                )).scalar()
+
+                return _academic_status_dict(student, current_credits)
         return None
 
     # ==================== COURSE QUERIES ====================
 
     async def get_course_registration_status(self, student_id: str) -> Optional[Dict[str, Any]]:
         """Ders kayıt durumunu döndürür."""
-        with self.get_session() as session:
+        async with self.get_async_session() as session:
             # Aktif kayıt dönemi
-            period = session.query(CourseRegistrationPeriod).filter(
-                CourseRegistrationPeriod.is_active == True
-            ).first()
+            period = (await session.execute(
+                select(CourseRegistrationPeriod).where(
+                    CourseRegistrationPeriod.is_active == True
+                )
+            )).scalars().first()
 
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+            student = await self._fetch_student(session, student_id)
 
             if period:
                 return {
                     "is_open": True,
-                    "start_date": period.start_date.strftime("%Y-%m-%d") if period.start_date else None,
-                    "end_date": period.end_date.strftime("%Y-%m-%d") if period.end_date else None,
+                    "start_date": period.start_date.isoformat()[:10] if period.start_date else None,
+                    "end_date": period.end_date.isoformat()[:10] if period.end_date else None,
                     "semester": period.semester,
                     "approval_status": "Onay Bekleniyor" if student else None
                 }
 
             # Gelecek dönem bilgisi
-            next_period = session.query(CourseRegistrationPeriod).filter(
-                CourseRegistrationPeriod.start_date > datetime.utcnow()
-            ).order_by(CourseRegistrationPeriod.start_date).first()
+            next_period = (await session.execute(
+                select(CourseRegistrationPeriod).where(
+                    CourseRegistrationPeriod.start_date > datetime.utcnow()
+                ).order_by(CourseRegistrationPeriod.start_date)
+            )).scalars().first()
 
             return {
                 "is_open": False,
-                "start_date": next_period.start_date.strftime("%Y-%m-%d") if next_period else None,
+                "start_date": next_period.start_date.isoformat()[:10] if next_period else None,
                 "end_date": None,
                 "semester": next_period.semester if next_period else None,
                 "approval_status": None
@@ -148,315 +482,207 @@ class DatabaseConnection:
 
     async def get_current_courses(self, student_id: str) -> List[Dict[str, Any]]:
         """Öğrencinin mevcut derslerini döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            # Ders bilgileri ve not, öğrenci numarası üzerinden tek JOIN sorgusu
+            # ile alınır; öğrenci yoksa sonuç zaten boştur
+            rows = await session.execute(
+                select(*_COURSE_COLUMNS)
+                .join(StudentCourse, StudentCourse.course_id == Course.id)
+                .join(Student, Student.id == StudentCourse.student_id)
+                .where(
+                    Student.student_id == student_id,
+                    StudentCourse.status == "Devam"
+                )
+                .order_by(StudentCourse.id)
+            )
 
-            if not student:
-                return []
-
-            enrollments = session.query(StudentCourse).filter(
-                StudentCourse.student_id == student.id,
-                StudentCourse.status == "Devam"
-            ).all()
-
-            courses = []
-            for enrollment in enrollments:
-                course = session.query(Course).get(enrollment.course_id)
-                if course:
-                    courses.append({
-                        "code": course.course_code,
-                        "name": course.course_name,
-                        "credits": course.credits,
-                        "instructor": course.instructor,
-                        "grade": enrollment.grade
-                    })
-
-            return courses
+            return [dict(zip(_COURSE_KEYS, row)) for row in rows]
 
     # ==================== TUITION QUERIES ====================
 
     async def get_tuition_status(self, student_id: str) -> Optional[Dict[str, Any]]:
         """Harç durumunu döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            student = await self._fetch_student(session, student_id, _STUDENT_WITH_TUITION)
 
             if not student:
                 return None
 
-            tuition = session.query(Tuition).filter(
-                Tuition.student_id == student.id
-            ).first()
-
-            if tuition:
-                return {
-                    "has_debt": tuition.has_debt,
-                    "debt_amount": tuition.debt_amount,
-                    "total_amount": tuition.total_amount,
-                    "paid_amount": tuition.paid_amount,
-                    "due_date": tuition.due_date.strftime("%Y-%m-%d") if tuition.due_date else None,
-                    "semester": tuition.semester
-                }
-
-            return {"has_debt": False, "debt_amount": 0}
+            return _tuition_status_dict(student.tuition)
 
     async def get_payment_history(self, student_id: str) -> List[Dict[str, Any]]:
         """Ödeme geçmişini döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
-
-            if not student:
-                return []
-
-            tuition = session.query(Tuition).filter(
-                Tuition.student_id == student.id
-            ).first()
-
-            if not tuition:
-                return []
-
-            payments = session.query(Payment).filter(
-                Payment.tuition_id == tuition.id
-            ).order_by(Payment.payment_date.desc()).all()
+        async with self.get_async_session() as session:
+            rows = await session.execute(
+                select(*_PAYMENT_COLUMNS)
+                .join(Tuition, Tuition.id == Payment.tuition_id)
+                .join(Student, Student.id == Tuition.student_id)
+                .where(Student.student_id == student_id)
+                .order_by(Payment.payment_date.desc())
+            )
 
             return [
-                {
-                    "date": p.payment_date.strftime("%Y-%m-%d"),
-                    "amount": p.amount,
-                    "method": p.payment_method,
-                    "receipt": p.receipt_no
-                }
-                for p in payments
+                dict(zip(_PAYMENT_KEYS, (date.isoformat()[:10], amount, method, receipt)))
+                for date, amount, method, receipt in rows
             ]
 
     async def get_installment_info(self, student_id: str) -> List[Dict[str, Any]]:
         """Taksit bilgilerini döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
-
-            if not student:
-                return []
-
-            tuition = session.query(Tuition).filter(
-                Tuition.student_id == student.id
-            ).first()
-
-            if not tuition:
-                return []
-
-            installments = session.query(Installment).filter(
-                Installment.tuition_id == tuition.id
-            ).order_by(Installment.installment_number).all()
+        async with self.get_async_session() as session:
+            rows = await session.execute(
+                select(*_INSTALLMENT_COLUMNS)
+                .join(Tuition, Tuition.id == Installment.tuition_id)
+                .join(Student, Student.id == Tuition.student_id)
+                .where(Student.student_id == student_id)
+                .order_by(Installment.installment_number)
+            )
 
             return [
-                {
-                    "number": i.installment_number,
-                    "amount": i.amount,
-                    "due_date": i.due_date.strftime("%Y-%m-%d") if i.due_date else None,
-                    "status": i.status
-                }
-                for i in installments
+                dict(zip(_INSTALLMENT_KEYS, (
+                    number, amount, due_date.isoformat()[:10] if due_date else None, status
+                )))
+                for number, amount, due_date, status in rows
             ]
 
     # ==================== SCHOLARSHIP QUERIES ====================
 
     async def get_scholarship_status(self, student_id: str) -> Optional[Dict[str, Any]]:
         """Burs durumunu döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            student = await self._fetch_student(session, student_id)
 
             if not student:
                 return None
 
-            scholarship = session.query(Scholarship).filter(
-                Scholarship.student_id == student.id,
-                Scholarship.status == "Aktif"
-            ).first()
-
-            if scholarship:
-                return {
-                    "active_scholarship": True,
-                    "scholarship_name": scholarship.scholarship_name,
-                    "scholarship_type": scholarship.scholarship_type,
-                    "monthly_amount": scholarship.monthly_amount,
-                    "start_date": scholarship.start_date.strftime("%Y-%m-%d") if scholarship.start_date else None,
-                    "end_date": scholarship.end_date.strftime("%Y-%m-%d") if scholarship.end_date else None
-                }
+            scholarship = (await session.execute(
+                select(Scholarship).where(
+                    Scholarship.student_id == student.id,
+                    Scholarship.status == "Aktif"
+                )
+            )).scalars().first()
 
-            return {"active_scholarship": False}
+            return _scholarship_status_dict(scholarship)
 
     async def get_scholarship_applications(self, student_id: str) -> List[Dict[str, Any]]:
         """Burs başvurularını döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
-
-            if not student:
-                return []
-
-            applications = session.query(ScholarshipApplication).filter(
-                ScholarshipApplication.student_id == student.id
-            ).order_by(ScholarshipApplication.application_date.desc()).all()
+        async with self.get_async_session() as session:
+            rows = await session.execute(
+                select(*_APPLICATION_COLUMNS)
+                .join(Student, Student.id == ScholarshipApplication.student_id)
+                .where(Student.student_id == student_id)
+                .order_by(ScholarshipApplication.application_date.desc())
+            )
 
             return [
-                {
-                    "scholarship_name": a.scholarship_name,
-                    "application_date": a.application_date.strftime("%Y-%m-%d"),
-                    "status": a.status
-                }
-                for a in applications
+                dict(zip(_APPLICATION_KEYS, (name, applied_at.isoformat()[:10], status)))
+                for name, applied_at, status in rows
             ]
 
     async def get_available_scholarships(self) -> List[Dict[str, Any]]:
         """Başvuruya açık bursları döndürür."""
-        with self.get_session() as session:
-            scholarships = session.query(AvailableScholarship).filter(
-                AvailableScholarship.is_active == True,
-                AvailableScholarship.deadline > datetime.utcnow()
-            ).all()
+        async with self.get_async_session() as session:
+            rows = await session.execute(
+                select(*_AVAILABLE_SCHOLARSHIP_COLUMNS).where(
+                    AvailableScholarship.is_active == True,
+                    AvailableScholarship.deadline > datetime.utcnow()
+                )
+            )
 
             return [
-                {
-                    "name": s.name,
-                    "description": s.description,
-                    "amount": s.monthly_amount,
-                    "min_gpa": s.min_gpa,
-                    "deadline": s.deadline.strftime("%Y-%m-%d") if s.deadline else None
-                }
-                for s in scholarships
+                dict(zip(_AVAILABLE_SCHOLARSHIP_KEYS, (
+                    name, description, amount, min_gpa,
+                    deadline.isoformat()[:10] if deadline else None
+                )))
+                for name, description, amount, min_gpa, deadline in rows
             ]
 
     # ==================== IT QUERIES ====================
 
     async def get_user_account(self, student_id: str) -> Optional[Dict[str, Any]]:
         """Kullanıcı hesap bilgilerini döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            student = await self._fetch_student(session, student_id, _STUDENT_WITH_ACCOUNT)
 
             if not student or not student.account:
                 return None
 
-            account = student.account
-            return {
-                "username": account.username,
-                "email": account.email,
-                "status": account.status,
-                "last_login": account.last_login.strftime("%Y-%m-%d %H:%M") if account.last_login else None,
-                "is_locked": account.is_locked
-            }
+            return _user_account_dict(student.account)
 
     async def get_password_info(self, student_id: str) -> Optional[Dict[str, Any]]:
         """Şifre bilgilerini döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            student = await self._fetch_student(session, student_id, _STUDENT_WITH_ACCOUNT)
 
             if not student or not student.account:
                 return None
 
             account = student.account
             return {
-                "last_changed": account.password_last_changed.strftime("%Y-%m-%d") if account.password_last_changed else None,
+                "last_changed": account.password_last_changed.isoformat()[:10] if account.password_last_changed else None,
                 "expired": account.password_expired
             }
 
     async def get_open_tickets(self, student_id: str, department: str = None) -> List[Dict[str, Any]]:
         """Açık destek taleplerini döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
-
-            if not student:
-                return []
-
-            query = session.query(ITTicket).filter(
-                ITTicket.student_id == student.id,
-                ITTicket.status.in_(["Açık", "İşlemde"])
+        async with self.get_async_session() as session:
+            query = (
+                select(*_TICKET_COLUMNS)
+                .join(Student, Student.id == ITTicket.student_id)
+                .where(
+                    Student.student_id == student_id,
+                    ITTicket.status.in_(["Açık", "İşlemde"])
+                )
             )
 
             if department:
-                query = query.filter(ITTicket.category.like(f"%{department}%"))
+                query = query.where(ITTicket.department == department)
 
-            tickets = query.all()
+            rows = await session.execute(query)
 
             return [
-                {
-                    "ticket_no": t.ticket_no,
-                    "subject": t.subject,
-                    "status": t.status,
-                    "created_at": t.created_at.strftime("%Y-%m-%d")
-                }
-                for t in tickets
+                dict(zip(_TICKET_KEYS, (ticket_no, subject, status, created_at.isoformat()[:10])))
+                for ticket_no, subject, status, created_at in rows
             ]
 
     async def get_known_issues(self, category: str = None) -> List[Dict[str, Any]]:
         """Bilinen sorunları döndürür."""
-        with self.get_session() as session:
-            query = session.query(KnownIssue).filter(
+        async with self.get_async_session() as session:
+            query = select(*_KNOWN_ISSUE_COLUMNS).where(
                 KnownIssue.is_resolved == False
             )
 
             if category:
-                query = query.filter(KnownIssue.category == category)
+                query = query.where(KnownIssue.category == category)
 
-            issues = query.all()
+            rows = await session.execute(query)
 
-            return [
-                {
-                    "title": i.title,
-                    "description": i.description,
-                    "solution": i.solution
-                }
-                for i in issues
-            ]
+            return [dict(zip(_KNOWN_ISSUE_KEYS, row)) for row in rows]
 
     async def get_user_devices(self, student_id: str) -> List[Dict[str, Any]]:
         """Kullanıcı cihazlarını döndürür."""
-        with self.get_session() as session:
-            student = session.query(Student).filter(
-                Student.student_id == student_id
-            ).first()
+        async with self.get_async_session() as session:
+            rows = await session.execute(
+                select(*_DEVICE_COLUMNS)
+                .join(Student, Student.id == Device.student_id)
+                .where(Student.student_id == student_id)
+            )
 
-            if not student:
-                return []
+            return [dict(zip(_DEVICE_KEYS, row)) for row in rows]
 
-            devices = session.query(Device).filter(
-                Device.student_id == student.id
-            ).all()
 
-            return [
-                {
-                    "type": d.device_type,
-                    "brand": d.brand,
-                    "model": d.model,
-                    "serial": d.serial_no
-                }
-                for d in devices
-            ]
+# lru_cache eşzamanlı iki ilk çağrıda fonksiyonu iki kez çalıştırabilir;
+# kilit, aynı URL için tek engine (ve tek connection pool) oluşmasını garanti eder.
+_db_lock = threading.Lock()
 
 
-# Singleton instance
-_db_instance: Optional[DatabaseConnection] = None
+@lru_cache(maxsize=None)
+def _create_database(database_url: str) -> DatabaseConnection:
+    db = DatabaseConnection(database_url)
+    db.create_tables()
+    return db
 
 
 def get_database(database_url: str = "sqlite:///./university.db") -> DatabaseConnection:
-    """Database connection singleton."""
-    global _db_instance
-    if _db_instance is None:
-        _db_instance = DatabaseConnection(database_url)
-        _db_instance.create_tables()
-    return _db_instance
+    """Database connection singleton (URL başına tek instance, thread-safe)."""
+    with _db_lock:
+        return _create_database(database_url)
@@ -2,16 +2,59 @@
 Database Models - SQLAlchemy modelleri.
 """
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 from sqlalchemy import (
     Column, Integer, String, Float, Boolean, DateTime,
-    ForeignKey, Text, Enum
+    ForeignKey, Text, Enum, Index, SmallInteger
 )
 from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
 
+class CodedString(TypeDecorator):
+    """
+    Kapalı bir değer kümesindeki metni veritabanında küçük tamsayı olarak saklar.
+
+    Python tarafında değerler metin kalır ("Devam", "Aktif" ...); sorgularda
+    karşılaştırmalar ve indeksler tamsayı üzerinden çalışır, satırlar küçülür.
+    Kodlar değerlerin sırasıdır: yeni değerler yalnızca sona eklenmeli.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, values: Tuple[str, ...]):
+        super().__init__()
+        self.values = tuple(values)
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self._codes[value]
+        except KeyError:
+            raise ValueError(f"Geçersiz değer: {value!r} (beklenen: {', '.join(self.values)})")
+
+    def process_result_value(self, value, dialect):
+        # Metin olarak saklanmış eski kayıtlar olduğu gibi döner
+        if value is None or isinstance(value, str):
+            return value
+        return self.values[value]
+
+
+# Durum kolonlarının değer kümeleri (sıra = veritabanı kodu)
+REGISTRATION_STATUSES = ("Aktif", "Pasif", "Dondurulmuş")
+ENROLLMENT_STATUSES = ("Devam", "Tamamlandı", "Bırakıldı")
+INSTALLMENT_STATUSES = ("Bekliyor", "Ödendi", "Gecikmiş")
+SCHOLARSHIP_STATUSES = ("Aktif", "Pasif", "Beklemede")
+APPLICATION_STATUSES = ("Beklemede", "Onaylandı", "Reddedildi")
+ACCOUNT_STATUSES = ("Aktif", "Kilitli", "Pasif")
+TICKET_STATUSES = ("Açık", "İşlemde", "Çözüldü", "Kapatıldı")
+
+
 class Student(Base):
     """Öğrenci tablosu."""
     __tablename__ = "students"
@@ -24,7 +67,7 @@ class Student(Base):
     faculty = Column(String(100))
     grade = Column(Integer)  # Sınıf
     enrollment_year = Column(Integer)
-    registration_status = Column(String(50), default="Aktif")  # Aktif, Pasif, Dondurulmuş
+    registration_status = Column(CodedString(REGISTRATION_STATUSES), default="Aktif")
     gpa = Column(Float, default=0.0)
     total_credits = Column(Integer, default=0)
     completed_credits = Column(Integer, default=0)
@@ -57,13 +100,16 @@ class Course(Base):
 class StudentCourse(Base):
     """Öğrenci-Ders ilişki tablosu."""
     __tablename__ = "student_courses"
+    __table_args__ = (
+        Index("ix_student_courses_student_status", "student_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     course_id = Column(Integer, ForeignKey("courses.id"))
     semester = Column(String(20))  # 2024-Güz
     grade = Column(String(5))  # AA, BA, vb.
-    status = Column(String(20), default="Devam")  # Devam, Tamamlandı, Bırakıldı
+    status = Column(CodedString(ENROLLMENT_STATUSES), default="Devam")
 
     # Relationships
     student = relationship("Student", back_populates="courses")
@@ -75,7 +121,7 @@ class Tuition(Base):
     __tablename__ = "tuition"
 
     id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     semester = Column(String(20))
     total_amount = Column(Float, default=0.0)
     paid_amount = Column(Float, default=0.0)
@@ -95,7 +141,7 @@ class Payment(Base):
     __tablename__ = "payments"
 
     id = Column(Integer, primary_key=True)
-    tuition_id = Column(Integer, ForeignKey("tuition.id"))
+    tuition_id = Column(Integer, ForeignKey("tuition.id"), index=True)
     amount = Column(Float)
     payment_date = Column(DateTime, default=datetime.utcnow)
     payment_method = Column(String(50))  # Kredi Kartı, Havale, vb.
@@ -110,11 +156,11 @@ class Installment(Base):
     __tablename__ = "installments"
 
     id = Column(Integer, primary_key=True)
-    tuition_id = Column(Integer, ForeignKey("tuition.id"))
+    tuition_id = Column(Integer, ForeignKey("tuition.id"), index=True)
     installment_number = Column(Integer)
     amount = Column(Float)
     due_date = Column(DateTime)
-    status = Column(String(20), default="Bekliyor")  # Bekliyor, Ödendi, Gecikmiş
+    status = Column(CodedString(INSTALLMENT_STATUSES), default="Bekliyor")
 
     # Relationships
     tuition = relationship("Tuition", back_populates="installments")
@@ -123,15 +169,18 @@ class Installment(Base):
 class Scholarship(Base):
     """Burs tablosu."""
     __tablename__ = "scholarships"
+    __table_args__ = (
+        Index("ix_scholarships_student_status", "student_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     scholarship_name = Column(String(100))
     scholarship_type = Column(String(50))  # Başarı, İhtiyaç, Tam, KYK
     monthly_amount = Column(Float, default=0.0)
     start_date = Column(DateTime)
     end_date = Column(DateTime)
-    status = Column(String(20), default="Aktif")  # Aktif, Pasif, Beklemede
+    status = Column(CodedString(SCHOLARSHIP_STATUSES), default="Aktif")
 
     # Relationships
     student = relationship("Student", back_populates="scholarships")
@@ -142,16 +191,19 @@ class ScholarshipApplication(Base):
     __tablename__ = "scholarship_applications"
 
     id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     scholarship_name = Column(String(100))
     application_date = Column(DateTime, default=datetime.utcnow)
-    status = Column(String(20), default="Beklemede")  # Beklemede, Onaylandı, Reddedildi
+    status = Column(CodedString(APPLICATION_STATUSES), default="Beklemede")
     notes = Column(Text)
 
 
 class AvailableScholarship(Base):
     """Başvuruya açık burslar."""
     __tablename__ = "available_scholarships"
+    __table_args__ = (
+        Index("ix_available_scholarships_active_deadline", "is_active", "deadline"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(100))
@@ -167,10 +219,10 @@ class UserAccount(Base):
     __tablename__ = "user_accounts"
 
     id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     username = Column(String(50), unique=True)
     email = Column(String(100))
-    status = Column(String(20), default="Aktif")  # Aktif, Kilitli, Pasif
+    status = Column(CodedString(ACCOUNT_STATUSES), default="Aktif")
     last_login = Column(DateTime)
     is_locked = Column(Boolean, default=False)
     failed_attempts = Column(Integer, default=0)
@@ -181,17 +233,35 @@ class UserAccount(Base):
     student = relationship("Student", back_populates="account")
 
 
+# Ticket kategorisi -> sahibi olan departman
+TICKET_CATEGORY_DEPARTMENTS = {
+    "tech_support": "it",
+    "email_support": "it",
+}
+
+
+def _ticket_department(context) -> Optional[str]:
+    """Insert sırasında department boşsa category'den doldurur."""
+    category = context.get_current_parameters().get("category")
+    return TICKET_CATEGORY_DEPARTMENTS.get(category, category)
+
+
 class ITTicket(Base):
     """IT destek talepleri."""
     __tablename__ = "it_tickets"
+    __table_args__ = (
+        Index("ix_it_tickets_student_status_department", "student_id", "status", "department"),
+    )
 
     id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     ticket_no = Column(String(20), unique=True)
     category = Column(String(50))  # tech_support, email_support
+    # category'den türetilir; departman filtresi LIKE yerine eşitlikle indeksten çalışır
+    department = Column(String(32), default=_ticket_department, index=True)
     subject = Column(String(200))
     description = Column(Text)
-    status = Column(String(20), default="Açık")  # Açık, İşlemde, Çözüldü, Kapatıldı
+    status = Column(CodedString(TICKET_STATUSES), default="Açık")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
     priority = Column(String(20), default="Normal")  # Düşük, Normal, Yüksek, Acil
@@ -215,7 +285,7 @@ class Device(Base):
     __tablename__ = "devices"
 
     id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     device_type = Column(String(50))  # Laptop, Desktop, vb.
     brand = Column(String(50))
     model = Column(String(100))
@@ -229,6 +299,6 @@ class CourseRegistrationPeriod(Base):
 
     id = Column(Integer, primary_key=True)
     semester = Column(String(20))
-    start_date = Column(DateTime)
+    start_date = Column(DateTime, index=True)
     end_date = Column(DateTime)
-    is_active = Column(Boolean, default=False)
+    is_active = Column(Boolean, default=False, index=True)
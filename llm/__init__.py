@@ -1,4 +1,6 @@
 from .provider import LLMProvider, get_llm_provider
 from .prompts import SystemPrompts
+from .batcher import AsyncLLMBatcher
+from .cache import LLMCache
 
-__all__ = ["LLMProvider", "get_llm_provider", "SystemPrompts"]
+__all__ = ["LLMProvider", "get_llm_provider", "SystemPrompts", "AsyncLLMBatcher", "LLMCache"]
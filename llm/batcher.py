@@ -0,0 +1,137 @@
+"""
+LLM Batcher - Eşzamanlı LLM çağrılarını tek kuyruktan yönetir.
+
+İstekler tek bir kuyruktan okunur ve ortak bir eşzamanlılık sınırı altında
+bekletilmeden provider'a gönderilir; yavaş bir çağrı sonraki istekleri
+bekletmez.
+"""
+import asyncio
+from functools import partial
+from typing import Any, Callable, Optional, Set, Tuple
+import structlog
+
+from .provider import LLMProvider
+
+logger = structlog.get_logger()
+
+
+def _cancel_if_abandoned(task: asyncio.Task, future: asyncio.Future):
+    """Sonucu bekleyen future iptal edildiyse ona bağlı dispatch task'ını iptal eder."""
+    if future.cancelled():
+        task.cancel()
+
+
+class AsyncLLMBatcher:
+    """
+    LLMProvider.generate çağrıları için asenkron batcher.
+
+    - submit() isteği kuyruğa koyar ve sonucu bekler
+    - Arka plan worker'ı her isteği ayrı bir task olarak hemen gönderir;
+      en fazla max_concurrency çağrı aynı anda çalışır
+    - Eşzamanlılık sınırı doluysa worker kuyruğu okumayı bekletir, kuyruk
+      da dolunca submit() bekler (backpressure)
+    - stop_when verilen istekler akışlı üretilir ve koşul sağlanınca kesilir
+    """
+
+    def __init__(
+        self,
+        llm: LLMProvider,
+        queue_size: int = 128,
+        max_concurrency: int = 16
+    ):
+        self.llm = llm
+        self._queue_size = queue_size
+        self._semaphore_size = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Devam eden provider çağrıları (referans tutulmazsa task GC'ye gidebilir)
+        self._in_flight: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self):
+        """Kuyruğu ve worker'ı çalışan event loop üzerinde ilk kullanımda başlatır."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+            self._semaphore = asyncio.Semaphore(self._semaphore_size)
+            self._in_flight = set()
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        stop_when: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """İsteği kuyruğa ekler ve LLM yanıtını döndürür."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((prompt, system_prompt, temperature, max_tokens, stop_when), future))
+        return await future
+
+    async def _run(self):
+        """Kuyruktan istekleri okuyup eşzamanlılık sınırı altında gönderen worker döngüsü."""
+        while True:
+            request, future = await self._queue.get()
+            await self._semaphore.acquire()
+            logger.debug("llm_batch_dispatch", in_flight=len(self._in_flight) + 1)
+            task = asyncio.create_task(self._dispatch(request, future))
+            self._in_flight.add(task)
+            task.add_done_callback(self._on_dispatch_done)
+            # Çağıran vazgeçerse (ör. wait_for zaman aşımı) provider çağrısı da
+            # iptal edilir ve eşzamanlılık hakkı boşa tutulmaz
+            future.add_done_callback(partial(_cancel_if_abandoned, task))
+
+    def _on_dispatch_done(self, task: asyncio.Task):
+        """Biten çağrının eşzamanlılık hakkını serbest bırakır."""
+        self._in_flight.discard(task)
+        self._semaphore.release()
+
+    async def _dispatch(self, request: Tuple[Any, ...], future: asyncio.Future):
+        """Tek isteği gönderir ve sonucu bekleyen future'a iletir."""
+        # Çağıran taraf zaman aşımıyla vazgeçtiyse provider'a gitme
+        if future.done():
+            return
+
+        prompt, system_prompt, temperature, max_tokens, stop_when = request
+        try:
+            if stop_when is None:
+                result = await self.llm.generate(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+            else:
+                result = await self.llm.generate_until(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stop_when=stop_when
+                )
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        if not future.done():
+            future.set_result(result)
+
+    async def close(self):
+        """Worker'ı ve devam eden çağrıları durdurur."""
+        for task in list(self._in_flight):
+            task.cancel()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
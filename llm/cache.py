@@ -0,0 +1,149 @@
+"""
+LLM Cache - Deterministik LLM yanıtlarının önbelleği.
+
+Yalnızca temperature=0 çağrıları önbelleğe alınır; aynı model, sistem
+promptu, prompt ve token limiti için tekrar API çağrısı yapılmaz. Varsayılan backend
+süreç içi LRU'dur, Redis varsa paylaşımlı backend kullanılabilir.
+"""
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+# Bellek içi önbelleğin tutacağı yanıt sayısı ve yanıt geçerlilik süresi
+_MEMORY_CACHE_SIZE = 1024
+_CACHE_TTL = 3600.0
+
+
+class CacheBackend(ABC):
+    """LLM önbellek backend'i için abstract base class."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Anahtara ait yanıtı döndürür, yoksa None."""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str):
+        """Yanıtı önbelleğe yazar."""
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Süreç içi TTL'li LRU önbellek."""
+
+    def __init__(self, max_size: int = _MEMORY_CACHE_SIZE, ttl: float = _CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> (son geçerlilik, yanıt)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        expires_at, value = cached
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis tabanlı önbellek.
+    Birden fazla süreç aynı yanıtları paylaşır; hatalar önbellek ıskası sayılır.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, ttl: float = _CACHE_TTL):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.ttl = ttl
+        self._redis = None
+
+    def _key(self, key: str) -> str:
+        return f"a2a:llm:{key}"
+
+    def _get_client(self):
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.Redis(host=self.host, port=self.port, db=self.db, decode_responses=True)
+        return self._redis
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            return await self._get_client().get(self._key(key))
+        except Exception as e:
+            logger.warning("llm_cache_redis_get_failed", error=str(e))
+            return None
+
+    async def set(self, key: str, value: str):
+        try:
+            await self._get_client().set(self._key(key), value, ex=int(self.ttl))
+        except Exception as e:
+            logger.warning("llm_cache_redis_set_failed", error=str(e))
+
+
+class LLMCache:
+    """
+    Deterministik LLM çağrıları için yanıt önbelleği.
+    Anahtar model, sistem promptu, prompt, temperature ve max_tokens'tan üretilir.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend or MemoryCacheBackend()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """
+        Önbellek anahtarı üretir; temperature > 0 ise (deterministik değil) None döner.
+        max_tokens anahtara dahildir: düşük limitle kesilmiş yanıt daha yüksek
+        limitli çağrıya dönmemeli.
+        """
+        if temperature > 0:
+            return None
+        payload = json.dumps(
+            {
+                "model": model,
+                "system": system_prompt,
+                "prompt": prompt,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Yanıtı döndürür ve hit/miss sayaçlarını günceller."""
+        value = await self.backend.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        """Yanıtı önbelleğe yazar."""
+        await self.backend.set(key, value)
@@ -1,6 +1,55 @@
 """
 System Prompts - Agent'lar için sistem promptları.
 """
+from functools import lru_cache
+from string import Formatter
+from typing import Tuple
+
+
+def _compile_template(template: str, *fields: str) -> Tuple[str, ...]:
+    """
+    str.format şablonunu sabit parçalarına ayırır.
+
+    Dönen tuple sabit parçaları içerir ({{ }} kaçışları çözülmüş); alanlar
+    verilen sırayla parçaların arasına yerleşir. Şablon her çağrıda yeniden
+    ayrıştırılmaz, prompt birleştirme tek bir str.join olur.
+    """
+    literals = []
+    current = ""
+    expected = iter(fields)
+    for literal, field_name, _spec, _conv in Formatter().parse(template):
+        current += literal
+        if field_name is None:
+            continue
+        if field_name != next(expected, None):
+            raise ValueError(f"Şablon alan sırası beklenenden farklı: {field_name}")
+        literals.append(current)
+        current = ""
+    literals.append(current)
+    if len(literals) != len(fields) + 1:
+        raise ValueError("Şablondaki alan sayısı beklenenden farklı")
+    return tuple(literals)
+
+
+# Departman agent'larının ortak yanıt kuralı; her agent promptunun sonunda
+# tek kez yer alır (bkz. with_agent_rules)
+AGENT_RULES = "Emoji KULLANMA, profesyonel ve kısa yanıt ver."
+
+
+def with_agent_rules(prompt: str) -> str:
+    """Sistem promptu ortak kuralı içermiyorsa sonuna ekler."""
+    if prompt.endswith(AGENT_RULES):
+        return prompt
+    return f"{prompt}\n{AGENT_RULES}"
+
+
+def _render(parts: Tuple[str, ...], *values: str) -> str:
+    """_compile_template parçalarını değerlerle birleştirir."""
+    pieces = [parts[0]]
+    for value, literal in zip(values, parts[1:]):
+        pieces.append(value)
+        pieces.append(literal)
+    return "".join(pieces)
 
 
 class SystemPrompts:
@@ -82,34 +131,34 @@ YANITLAMA KURALLARI:
 Görevin bilgisayar, yazılım ve sistem sorunlarını çözmek.
 Kullanıcıya adım adım çözüm önerileri sun.
 Verilen bilgilere dayanarak yanıt ver, tahmin yapma.
-Emoji KULLANMA, profesyonel ve kısa yanıt ver."""
+""" + AGENT_RULES
 
     IT_EMAIL_SUPPORT = """Sen üniversitenin IT departmanında e-posta destek uzmanısın.
 Görevin e-posta hesapları, şifre sıfırlama ve erişim sorunlarını çözmek.
 Güvenlik protokollerine uy ve hassas bilgileri paylaşma.
-Emoji KULLANMA, profesyonel ve kısa yanıt ver."""
+""" + AGENT_RULES
 
     # Öğrenci İşleri agentları için
     STUDENT_REGISTRATION = """Sen üniversitenin öğrenci işleri departmanında kayıt uzmanısın.
 Görevin öğrenci kayıtları, belge talepleri ve durum sorgularıyla ilgilenmek.
 Öğrenci numarasına göre veritabanından bilgi çek ve doğru bilgi ver.
-Emoji KULLANMA, profesyonel ve kısa yanıt ver."""
+""" + AGENT_RULES
 
     STUDENT_COURSE = """Sen üniversitenin öğrenci işleri departmanında ders koordinatörüsün.
 Görevin ders kayıtları, program değişiklikleri ve ders bilgileriyle ilgilenmek.
 Akademik takvim ve ön koşulları dikkate alarak yanıt ver.
-Emoji KULLANMA, profesyonel ve kısa yanıt ver."""
+""" + AGENT_RULES
 
     # Mali İşler agentları için
     FINANCE_TUITION = """Sen üniversitenin mali işler departmanında harç uzmanısın.
 Görevin harç ödemeleri, borç durumu ve ödeme planlarıyla ilgilenmek.
 Öğrenci numarasına göre mali durumu kontrol et.
-Emoji KULLANMA, profesyonel ve kısa yanıt ver."""
+""" + AGENT_RULES
 
     FINANCE_SCHOLARSHIP = """Sen üniversitenin mali işler departmanında burs koordinatörüsün.
 Görevin burs başvuruları, durumları ve şartlarıyla ilgilenmek.
 Burs kriterleri hakkında doğru bilgi ver.
-Emoji KULLANMA, profesyonel ve kısa yanıt ver."""
+""" + AGENT_RULES
 
     # RAG sorgusu için
     RAG_QUERY = """Aşağıdaki bağlam bilgilerine dayanarak soruyu yanıtla.
@@ -131,11 +180,8 @@ Yanıtını Türkçe olarak ver. Bağlamda cevap yoksa sadece "Bu konuda ilgili
     @classmethod
     def get_department_orchestrator_prompt(cls, department: str, agents: list) -> str:
         """Departman orchestrator promptu oluşturur."""
-        agents_str = "\n".join([f"- {a['id']}: {a['description']}" for a in agents])
-        return cls.DEPARTMENT_ORCHESTRATOR.format(
-            department=department,
-            agents=agents_str
-        )
+        agents_key = tuple((a["id"], a["description"]) for a in agents)
+        return _department_orchestrator_prompt(department, agents_key)
 
     @classmethod
     def get_response_synthesizer_prompt(cls, user_query: str, responses: list) -> str:
@@ -144,15 +190,26 @@ Yanıtını Türkçe olarak ver. Bağlamda cevap yoksa sadece "Bu konuda ilgili
             f"[{r['department']}]: {r['response']}"
             for r in responses
         ])
-        return cls.RESPONSE_SYNTHESIZER.format(
-            user_query=user_query,
-            responses=responses_str
-        )
+        return _render(_RESPONSE_SYNTHESIZER_PARTS, user_query, responses_str)
 
     @classmethod
     def get_rag_prompt(cls, context: str, question: str) -> str:
         """RAG sorgu promptu oluşturur."""
-        return cls.RAG_QUERY.format(
-            context=context,
-            question=question
-        )
+        return _render(_RAG_QUERY_PARTS, context, question)
+
+
+# Şablonlar modül yüklenirken bir kez parçalanır
+_DEPARTMENT_ORCHESTRATOR_PARTS = _compile_template(
+    SystemPrompts.DEPARTMENT_ORCHESTRATOR, "department", "agents"
+)
+_RESPONSE_SYNTHESIZER_PARTS = _compile_template(
+    SystemPrompts.RESPONSE_SYNTHESIZER, "user_query", "responses"
+)
+_RAG_QUERY_PARTS = _compile_template(SystemPrompts.RAG_QUERY, "context", "question")
+
+
+@lru_cache(maxsize=256)
+def _department_orchestrator_prompt(department: str, agents: Tuple[Tuple[str, str], ...]) -> str:
+    """Departman ve agent listesi aynı kaldıkça prompt önbellekten döner."""
+    agents_str = "\n".join([f"- {agent_id}: {description}" for agent_id, description in agents])
+    return _render(_DEPARTMENT_ORCHESTRATOR_PARTS, department, agents_str)
@@ -5,13 +5,88 @@ Primary provider çalışmazsa otomatik fallback yapar.
 """
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 import structlog
 import json
-from functools import partial
+import re
+import time
+from functools import lru_cache, partial, wraps
+
+from .cache import LLMCache
+
+try:
+    import aiohttp
+except ImportError:  # Yalnızca OllamaQwenProvider için gerekli
+    aiohttp = None
 
 logger = structlog.get_logger()
 
+# Bulut SDK'ları ağır olduğundan ilk kullanımda bir kez import edilir
+_genai = None
+_anthropic = None
+
+
+def _load_genai():
+    """google.generativeai modülünü ilk çağrıda import eder."""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        _genai = genai
+    return _genai
+
+
+def _load_anthropic():
+    """anthropic modülünü ilk çağrıda import eder."""
+    global _anthropic
+    if _anthropic is None:
+        import anthropic
+        _anthropic = anthropic
+    return _anthropic
+
+# is_available sonucu bu süre boyunca tekrar kullanılır; her kontrolde
+# canlı API isteği atılmaz
+_AVAILABILITY_TTL = 60.0
+
+
+def _cache_availability(check):
+    """is_available sonucunu provider üzerinde _AVAILABILITY_TTL süresince saklar."""
+    @wraps(check)
+    async def wrapper(self) -> bool:
+        now = time.monotonic()
+        if self._availability is not None and now - self._availability[0] < _AVAILABILITY_TTL:
+            return self._availability[1]
+        result = await check(self)
+        self._availability = (now, result)
+        return result
+    return wrapper
+
+
+# LLMProvider devre kesicisi: primary art arda bu kadar geçici hata verirse
+# belirtilen süre boyunca doğrudan fallback kullanılır
+_BREAKER_FAILURE_THRESHOLD = 3
+_BREAKER_OPEN_SECONDS = 30.0
+# Devreyi açan HTTP durum kodları (rate limit ve sunucu hataları)
+_BREAKER_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _opens_breaker(error: Exception) -> bool:
+    """
+    Hatanın geçici (timeout, bağlantı, 429/5xx) olup olmadığını döndürür.
+    Doğrulama, yetki ve eksik bağımlılık hataları devreyi açmaz.
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if _anthropic is not None and isinstance(error, _anthropic.APIConnectionError):
+        return True
+    if aiohttp is not None and isinstance(error, aiohttp.ClientConnectionError):
+        return True
+    # anthropic: status_code, aiohttp: status, google.api_core: code
+    for attr in ("status_code", "status", "code"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            return status in _BREAKER_STATUS_CODES
+    return False
+
 
 class BaseLLMProvider(ABC):
     """LLM Provider için abstract base class."""
@@ -27,11 +102,43 @@ class BaseLLMProvider(ABC):
         """Metin üretir."""
         pass
 
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        """
+        Metni parça parça üretir.
+
+        Varsayılan: akış desteklemeyen provider'larda generate() sonucu tek
+        parça olarak döner.
+        """
+        yield await self.generate(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
     @abstractmethod
     async def is_available(self) -> bool:
         """Provider'ın erişilebilir olup olmadığını kontrol eder."""
         pass
 
+    async def warmup(self):
+        """
+        Bağlantıyı ve SDK başlatmasını ilk kullanıcı isteğinden önce yapar.
+        Hafif erişilebilirlik kontrolü (model bilgisi / etiket listesi)
+        kullanılır; token harcamaz ve is_available önbelleğini de doldurur.
+        """
+        await self.is_available()
+
+    async def aclose(self):
+        """Provider'ın açık bağlantılarını kapatır."""
+        pass
+
 
 class GeminiProvider(BaseLLMProvider):
     """Google Gemini API Provider."""
@@ -40,10 +147,11 @@ class GeminiProvider(BaseLLMProvider):
         self.api_key = api_key
         self.model = model
         self._client = None
+        self._availability: Optional[Tuple[float, bool]] = None
 
     def _get_client(self):
         if self._client is None:
-            import google.generativeai as genai
+            genai = _load_genai()
             genai.configure(api_key=self.api_key)
             self._client = genai.GenerativeModel(self.model)
         return self._client
@@ -63,20 +171,16 @@ class GeminiProvider(BaseLLMProvider):
             if system_prompt:
                 full_prompt = f"{system_prompt}\n\n{prompt}"
 
-            # Async wrapper with timeout
-            loop = asyncio.get_event_loop()
+            # SDK'nın native async çağrısı, timeout ile
             logger.debug("gemini_generate_start", prompt_length=len(full_prompt), max_tokens=max_tokens)
             
             response = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    lambda: client.generate_content(
-                        full_prompt,
-                        generation_config={
-                            "temperature": temperature,
-                            "max_output_tokens": max_tokens
-                        }
-                    )
+                client.generate_content_async(
+                    full_prompt,
+                    generation_config={
+                        "temperature": temperature,
+                        "max_output_tokens": max_tokens
+                    }
                 ),
                 timeout=30.0  # 30 saniye timeout (15'ten artırıldı - API yavaş olabilir)
             )
@@ -97,15 +201,13 @@ class GeminiProvider(BaseLLMProvider):
                        prompt_preview=full_prompt[:100] if 'full_prompt' in locals() else "N/A")
             raise
 
+    @_cache_availability
     async def is_available(self) -> bool:
         try:
-            client = self._get_client()
-            # Basit bir test
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: client.generate_content("test", generation_config={"max_output_tokens": 10})
-            )
+            genai = _load_genai()
+            self._get_client()
+            # Üretim yerine model bilgisini sorgula (ücretsiz, token harcamaz)
+            await asyncio.to_thread(genai.get_model, f"models/{self.model}")
             return True
         except Exception:
             return False
@@ -118,11 +220,11 @@ class ClaudeProvider(BaseLLMProvider):
         self.api_key = api_key
         self.model = model
         self._client = None
+        self._availability: Optional[Tuple[float, bool]] = None
 
     def _get_client(self):
         if self._client is None:
-            import anthropic
-            self._client = anthropic.Anthropic(api_key=self.api_key)
+            self._client = _load_anthropic().AsyncAnthropic(api_key=self.api_key)
         return self._client
 
     async def generate(
@@ -135,19 +237,15 @@ class ClaudeProvider(BaseLLMProvider):
         try:
             client = self._get_client()
 
-            # Async wrapper with timeout
-            loop = asyncio.get_event_loop()
+            # AsyncAnthropic çağrısı, timeout ile
             logger.debug("claude_generate_start", prompt_length=len(prompt), max_tokens=max_tokens)
             
             response = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    lambda: client.messages.create(
-                        model=self.model,
-                        max_tokens=max_tokens,
-                        system=system_prompt or "Sen yardımcı bir asistansın.",
-                        messages=[{"role": "user", "content": prompt}]
-                    )
+                client.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    system=system_prompt or "Sen yardımcı bir asistansın.",
+                    messages=[{"role": "user", "content": prompt}]
                 ),
                 timeout=30.0  # 30 saniye timeout (15'ten artırıldı - API yavaş olabilir)
             )
@@ -169,32 +267,62 @@ class ClaudeProvider(BaseLLMProvider):
                        prompt_preview=prompt[:100])
             raise
 
+    @_cache_availability
     async def is_available(self) -> bool:
         try:
             client = self._get_client()
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: client.messages.create(
-                    model=self.model,
-                    max_tokens=10,
-                    messages=[{"role": "user", "content": "test"}]
-                )
-            )
+            # Üretim yerine model bilgisini sorgula (ücretsiz, token harcamaz)
+            await client.models.retrieve(self.model)
             return True
         except Exception:
             return False
 
 
+# Ollama bağlantı havuzu: agent zincirindeki ardışık çağrılar açık
+# bağlantıyı tekrar kullanır; bekleme süresi aiohttp varsayılanı (15 sn)
+# yerine yanıt üretim aralıklarını kapsayacak kadar uzun tutulur
+_OLLAMA_POOL_SIZE = 10
+_OLLAMA_KEEPALIVE_TIMEOUT = 60.0
+
+
 class OllamaQwenProvider(BaseLLMProvider):
     """
     Ollama üzerinden local Qwen 2.5 (veya diğer Qwen modelleri) için provider.
     Varsayılan endpoint: http://localhost:11434/api/chat
+
+    HTTP çağrıları aiohttp ile doğrudan event loop üzerinde yapılır; thread
+    havuzuna geçiş olmaz ve eşzamanlı istekler aynı oturumu paylaşır.
     """
 
     def __init__(self, model: str = "qwen2.5:latest", base_url: str = "http://localhost:11434"):
         self.model = model
         self.base_url = base_url.rstrip("/")
+        self._session = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._availability: Optional[Tuple[float, bool]] = None
+
+    def _get_session(self):
+        """aiohttp oturumunu çalışan event loop üzerinde ilk kullanımda açar."""
+        if aiohttp is None:
+            raise ImportError("OllamaQwenProvider için aiohttp gerekli: pip install aiohttp")
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=_OLLAMA_POOL_SIZE,
+                    keepalive_timeout=_OLLAMA_KEEPALIVE_TIMEOUT,
+                ),
+                headers={"Accept-Encoding": "gzip, deflate"},
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def aclose(self):
+        """HTTP oturumunu kapatır."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     def _build_payload(self, prompt: str, system_prompt: Optional[str], temperature: float, max_tokens: int) -> Dict[str, Any]:
         messages: List[Dict[str, str]] = []
@@ -218,22 +346,11 @@ class OllamaQwenProvider(BaseLLMProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
     ) -> str:
-        import requests  # Lokal dependency, yoksa kullanıcıya hata verir
-
         payload = self._build_payload(prompt, system_prompt, temperature, max_tokens)
         url = f"{self.base_url}/api/chat"
 
-        def _call_ollama() -> str:
-            resp = requests.post(url, json=payload, timeout=40)
-            resp.raise_for_status()
-            data = resp.json()
-            # Ollama chat cevabı: {"message": {"role": "...", "content": "..."}, ...}
-            message = data.get("message") or {}
-            content = message.get("content", "")
-            return content
-
         try:
-            loop = asyncio.get_event_loop()
+            session = self._get_session()
             logger.debug(
                 "ollama_qwen_generate_start",
                 prompt_length=len(prompt),
@@ -241,10 +358,11 @@ class OllamaQwenProvider(BaseLLMProvider):
                 model=self.model,
                 base_url=self.base_url,
             )
-            content = await asyncio.wait_for(
-                loop.run_in_executor(None, _call_ollama),
-                timeout=45.0,
-            )
+            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=45.0)) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+            # Ollama chat cevabı: {"message": {"role": "...", "content": "..."}, ...}
+            content = (data.get("message") or {}).get("content", "")
             logger.debug(
                 "ollama_qwen_generate_success",
                 response_length=len(content) if content else 0,
@@ -264,21 +382,157 @@ class OllamaQwenProvider(BaseLLMProvider):
             )
             raise
 
-    async def is_available(self) -> bool:
-        import requests
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+    ) -> AsyncIterator[str]:
+        """
+        Ollama chat akışını parça parça döndürür.
 
-        url = f"{self.base_url}/api/tags"
+        Tüketici akışı erken kapatırsa yanıt kapatılır, bağlantı kesilir ve
+        Ollama üretimi durdurur.
+        """
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens)
+        payload["stream"] = True
+        url = f"{self.base_url}/api/chat"
 
-        def _check() -> bool:
-            try:
-                resp = requests.get(url, timeout=5)
+        logger.debug(
+            "ollama_qwen_stream_start",
+            prompt_length=len(prompt),
+            max_tokens=max_tokens,
+            model=self.model,
+        )
+        try:
+            session = self._get_session()
+            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=45.0)) as resp:
                 resp.raise_for_status()
-                return True
-            except Exception:
-                return False
+                async for line in resp.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    content = (data.get("message") or {}).get("content", "")
+                    if content:
+                        yield content
+                    if data.get("done"):
+                        return
+        except asyncio.TimeoutError:
+            logger.error("ollama_qwen_timeout", timeout=45.0, prompt_preview=prompt[:100])
+            raise
+        except Exception as e:
+            logger.error(
+                "ollama_qwen_error",
+                error_type=type(e).__name__,
+                error=str(e),
+                prompt_preview=prompt[:100],
+            )
+            raise
+
+    @_cache_availability
+    async def is_available(self) -> bool:
+        try:
+            session = self._get_session()
+            async with session.get(f"{self.base_url}/api/tags", timeout=aiohttp.ClientTimeout(total=5.0)) as resp:
+                resp.raise_for_status()
+            return True
+        except Exception:
+            return False
 
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _check)
+
+# MockProvider anahtar kelimeleri tek regex geçişinde bulunur. Lookahead
+# örtüşen eşleşmeleri de yakalar; bir anahtar kelime kendisiyle başlayan
+# daha kısa anahtar kelimeleri de içerir ("email_support" -> "email").
+_MOCK_KEYWORDS = (
+    "json", "department", "servis adını yaz",
+    "harç", "borç", "var mı", "ders kaydı", "ders kayıt", "ders", "kayı",
+    "şifre", "parola", "burs", "email", "hesap",
+    "tech_support", "email_support", "registration", "course", "tuition", "scholarship",
+)
+_MOCK_KEYWORD_TAGS = {
+    keyword: frozenset(other for other in _MOCK_KEYWORDS if keyword.startswith(other))
+    for keyword in _MOCK_KEYWORDS
+}
+_MOCK_KEYWORD_RE = re.compile("(?=({}))".format(
+    "|".join(re.escape(k) for k in sorted(_MOCK_KEYWORDS, key=len, reverse=True))
+))
+
+# Kurallar sırayla denenir: (hepsi geçmeli, en az biri geçmeli, sonuç)
+_MOCK_REPLIES = (
+    (frozenset({"harç"}), frozenset({"borç", "var mı"}),
+     "Harç borcu durumunuzu kontrol ettim. Sonuçları ilgili departmandan alınan bilgilere göre değerlendiriyorum."),
+    (frozenset(), frozenset({"ders kaydı", "ders kayıt"}),
+     "Ders kaydı işlemi için öğrenci işleri departmanından bilgi alınmıştır. Sonuçları değerlendiriyorum."),
+    (frozenset(), frozenset({"şifre", "parola"}),
+     "Şifre sıfırlama işlemi IT departmanı tarafından ele alınacaktır."),
+    (frozenset({"burs"}), frozenset(),
+     "Burs başvuru durumunuz mali işler departmanı tarafından kontrol edilecektir."),
+)
+
+_MOCK_TASKS = (
+    (frozenset({"harç"}), frozenset(), {
+        "department": "finance",
+        "task_type": "query",
+        "query": "Harç borcu durumu sorgulanıyor",
+        "priority": 3,
+        "depends_on": []
+    }),
+    (frozenset({"ders", "kayı"}), frozenset(), {
+        "department": "student_affairs",
+        "task_type": "query",
+        "query": "Ders kaydı durumu sorgulanıyor",
+        "priority": 3,
+        "depends_on": []
+    }),
+    (frozenset(), frozenset({"şifre", "parola"}), {
+        "department": "it",
+        "task_type": "action",
+        "query": "Şifre sıfırlama işlemi",
+        "priority": 4,
+        "depends_on": []
+    }),
+    (frozenset({"burs"}), frozenset(), {
+        "department": "finance",
+        "task_type": "query",
+        "query": "Burs başvurusu bilgisi",
+        "priority": 2,
+        "depends_on": []
+    }),
+)
+_MOCK_DEFAULT_TASK = {
+    "department": "student_affairs",
+    "task_type": "query",
+    "query": "Genel sorgu",
+    "priority": 2,
+    "depends_on": []
+}
+
+# Eşleşen _MOCK_TASKS indeksleri -> üretilmiş task JSON'ı
+_MOCK_TASK_JSON_CACHE: Dict[Tuple[int, ...], str] = {}
+
+# Departman içi yönlendirme: (departman servisleri, alt servis kelimeleri,
+# kelime varsa seçilen servis, yoksa seçilen servis)
+_MOCK_ROUTES = (
+    (frozenset({"tech_support", "email_support"}), frozenset({"şifre", "email", "hesap"}), "email_support", "tech_support"),
+    (frozenset({"registration", "course"}), frozenset({"ders"}), "course", "registration"),
+    (frozenset({"tuition", "scholarship"}), frozenset({"burs"}), "scholarship", "tuition"),
+)
+
+
+@lru_cache(maxsize=256)
+def _mock_tags(prompt: str) -> frozenset:
+    """Prompt'ta geçen MockProvider anahtar kelimelerini döndürür (aynı prompt için önbellekli)."""
+    tags = set()
+    for match in _MOCK_KEYWORD_RE.finditer(prompt.lower()):
+        tags |= _MOCK_KEYWORD_TAGS[match.group(1)]
+    return frozenset(tags)
+
+
+def _mock_rule_matches(tags: frozenset, required: frozenset, any_of: frozenset) -> bool:
+    """Kuralın tüm zorunlu kelimeleri ve (varsa) seçeneklerden biri geçiyor mu?"""
+    return required <= tags and (not any_of or not tags.isdisjoint(any_of))
 
 
 class MockProvider(BaseLLMProvider):
@@ -296,111 +550,49 @@ class MockProvider(BaseLLMProvider):
     ) -> str:
         logger.warning("using_mock_provider")
 
-        prompt_lower = prompt.lower()
+        tags = _mock_tags(prompt)
 
         # Main orchestrator JSON formatı bekliyorsa
-        if "json" in prompt_lower and "department" in prompt_lower:
-            return self._generate_task_json(prompt_lower)
+        if "json" in tags and "department" in tags:
+            return self._generate_task_json(tags)
 
         # Departman yönlendirmesi
-        if "servis adını yaz" in prompt_lower:
-            return self._route_department(prompt_lower)
+        if "servis adını yaz" in tags:
+            return self._route_department(tags)
 
         # Basit anahtar kelime tabanlı yanıtlar
-        if "harç" in prompt_lower and ("borç" in prompt_lower or "var mı" in prompt_lower):
-            return "Harç borcu durumunuzu kontrol ettim. Sonuçları ilgili departmandan alınan bilgilere göre değerlendiriyorum."
-
-        if "ders kaydı" in prompt_lower or "ders kayıt" in prompt_lower:
-            return "Ders kaydı işlemi için öğrenci işleri departmanından bilgi alınmıştır. Sonuçları değerlendiriyorum."
-
-        if "şifre" in prompt_lower or "parola" in prompt_lower:
-            return "Şifre sıfırlama işlemi IT departmanı tarafından ele alınacaktır."
-
-        if "burs" in prompt_lower:
-            return "Burs başvuru durumunuz mali işler departmanı tarafından kontrol edilecektir."
+        for required, any_of, reply in _MOCK_REPLIES:
+            if _mock_rule_matches(tags, required, any_of):
+                return reply
 
         return f"İsteğiniz alındı ve ilgili departmanlara iletildi. Toplanan bilgiler: {prompt[:100]}..."
 
-    def _generate_task_json(self, prompt: str) -> str:
-        """Orchestrator için task JSON'ı üretir."""
-        import json
-
-        tasks = []
-
-        # Harç ile ilgili
-        if "harç" in prompt:
-            tasks.append({
-                "department": "finance",
-                "task_type": "query",
-                "query": "Harç borcu durumu sorgulanıyor",
-                "priority": 3,
-                "depends_on": []
-            })
-
-        # Ders kaydı ile ilgili
-        if "ders" in prompt and "kayı" in prompt:
-            tasks.append({
-                "department": "student_affairs",
-                "task_type": "query",
-                "query": "Ders kaydı durumu sorgulanıyor",
-                "priority": 3,
-                "depends_on": []
-            })
-
-        # Şifre ile ilgili
-        if "şifre" in prompt or "parola" in prompt:
-            tasks.append({
-                "department": "it",
-                "task_type": "action",
-                "query": "Şifre sıfırlama işlemi",
-                "priority": 4,
-                "depends_on": []
-            })
-
-        # Burs ile ilgili
-        if "burs" in prompt:
-            tasks.append({
-                "department": "finance",
-                "task_type": "query",
-                "query": "Burs başvurusu bilgisi",
-                "priority": 2,
-                "depends_on": []
-            })
-
-        # Varsayılan task
-        if not tasks:
-            tasks.append({
-                "department": "student_affairs",
-                "task_type": "query",
-                "query": "Genel sorgu",
-                "priority": 2,
-                "depends_on": []
-            })
-
-        return json.dumps({
-            "analysis": "Anahtar kelime tabanlı analiz yapıldı",
-            "tasks": tasks
-        }, ensure_ascii=False)
-
-    def _route_department(self, prompt: str) -> str:
+    def _generate_task_json(self, tags: frozenset) -> str:
+        """
+        Orchestrator için task JSON'ı üretir. Olası çıktı sayısı eşleşen
+        kural kombinasyonlarıyla sınırlı olduğundan her kombinasyonun JSON'ı
+        bir kez üretilip saklanır.
+        """
+        matched = tuple(
+            index for index, (required, any_of, _) in enumerate(_MOCK_TASKS)
+            if _mock_rule_matches(tags, required, any_of)
+        )
+        response = _MOCK_TASK_JSON_CACHE.get(matched)
+        if response is None:
+            # Varsayılan task
+            tasks = [_MOCK_TASKS[index][2] for index in matched] or [_MOCK_DEFAULT_TASK]
+            response = json.dumps({
+                "analysis": "Anahtar kelime tabanlı analiz yapıldı",
+                "tasks": tasks
+            }, ensure_ascii=False)
+            _MOCK_TASK_JSON_CACHE[matched] = response
+        return response
+
+    def _route_department(self, tags: frozenset) -> str:
         """Departman içi yönlendirme."""
-        # IT departmanı
-        if "tech_support" in prompt or "email_support" in prompt:
-            if "şifre" in prompt or "email" in prompt or "hesap" in prompt:
-                return "email_support"
-            return "tech_support"
-
-        # Öğrenci işleri
-        if "registration" in prompt or "course" in prompt:
-            if "ders" in prompt:
-                return "course"
-            return "registration"
-
-        # Mali işler
-        if "tuition" in prompt or "scholarship" in prompt:
-            if "burs" in prompt:
-                return "scholarship"
-            return "tuition"
+        for services, keywords, matched, default in _MOCK_ROUTES:
+            if not tags.isdisjoint(services):
+                return matched if not tags.isdisjoint(keywords) else default
 
         return "registration"
 
@@ -417,11 +609,26 @@ class LLMProvider:
     def __init__(
         self,
         primary_provider: BaseLLMProvider,
-        fallback_provider: Optional[BaseLLMProvider] = None
+        fallback_provider: Optional[BaseLLMProvider] = None,
+        cache: Optional[LLMCache] = None
     ):
         self.primary = primary_provider
         self.fallback = fallback_provider
         self._current_provider: Optional[BaseLLMProvider] = None
+        # Deterministik (temperature=0) yanıtların önbelleği; mock yanıtlar
+        # zaten yerel olduğundan önbelleğe alınmaz
+        if cache is None and not isinstance(primary_provider, MockProvider):
+            cache = LLMCache()
+        self.cache = cache
+        # Primary için devre kesici: art arda geçici hatalarda primary atlanır
+        self._primary_breaker: Dict[str, float] = {"failures": 0, "open_until": 0.0}
+        # get_llm_provider'ın başlattığı bağlantı ısıtma görevi
+        self._warmup_task: Optional[asyncio.Task] = None
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Önbellek hit/miss sayaçları."""
+        return self.cache.stats if self.cache else {"hits": 0, "misses": 0}
 
     async def generate(
         self,
@@ -433,50 +640,229 @@ class LLMProvider:
         """
         LLM'den metin üretir.
         Primary başarısız olursa fallback'e geçer.
+        temperature=0 çağrılarında aynı istek önbellekten yanıtlanır.
         """
-        # Primary dene
-        try:
-            logger.debug("trying_primary_provider", provider=self.primary.__class__.__name__)
-            result = await self.primary.generate(
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMCache.make_key(
+                getattr(self.primary, "model", self.primary.__class__.__name__),
+                prompt, system_prompt, temperature, max_tokens
+            )
+        if cache_key is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("llm_cache_hit", provider=self.primary.__class__.__name__)
+                return cached
+
+        result, provider = await self._generate_uncached(prompt, system_prompt, temperature, max_tokens)
+        # Anahtar primary modeline göredir; fallback (mock dahil) yanıtı
+        # önbelleğe yazılırsa primary düzeldikten sonra da servis edilirdi
+        if cache_key is not None and provider is self.primary:
+            await self.cache.set(cache_key, result)
+        return result
+
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[str, BaseLLMProvider]:
+        """
+        Primary'yi dener, başarısız olursa fallback'e geçer.
+        Primary devre kesicisi açıksa ve fallback varsa primary hiç denenmez.
+        Yanıtla birlikte yanıtı üreten provider'ı döndürür.
+        """
+        if self._primary_circuit_open():
+            error_type = "CircuitOpen"
+            logger.debug("primary_circuit_open", provider=self.primary.__class__.__name__)
+        else:
+            # Primary dene
+            try:
+                logger.debug("trying_primary_provider", provider=self.primary.__class__.__name__)
+                result = await self.primary.generate(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+                self._current_provider = self.primary
+                self._primary_breaker["failures"] = 0
+                logger.info("primary_provider_success", provider=self.primary.__class__.__name__)
+                return result, self.primary
+
+            except Exception as e:
+                error_type = type(e).__name__
+                logger.warning("primary_provider_failed", 
+                             provider=self.primary.__class__.__name__,
+                             error_type=error_type,
+                             error=str(e))
+                self._record_primary_failure(e)
+
+        # Fallback dene
+        if self.fallback:
+            try:
+                logger.info("trying_fallback_provider", provider=self.fallback.__class__.__name__)
+                result = await self.fallback.generate(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+                self._current_provider = self.fallback
+                logger.info("fallback_provider_success", provider=self.fallback.__class__.__name__)
+                return result, self.fallback
+
+            except Exception as e2:
+                error_type2 = type(e2).__name__
+                logger.error("fallback_provider_failed", 
+                           provider=self.fallback.__class__.__name__,
+                           error_type=error_type2,
+                           error=str(e2))
+                raise RuntimeError(f"Tüm LLM provider'lar başarısız oldu: primary={error_type}, fallback={error_type2}")
+
+        raise RuntimeError(f"Tüm LLM provider'lar başarısız oldu: primary={error_type}, fallback=yok")
+
+    def _primary_circuit_open(self) -> bool:
+        """Primary devre kesicisi açıksa (ve geçilecek fallback varsa) True döner."""
+        return self.fallback is not None and time.monotonic() < self._primary_breaker["open_until"]
+
+    def _record_primary_failure(self, error: Exception):
+        """
+        Primary hatasını sayar. Art arda _BREAKER_FAILURE_THRESHOLD geçici hatada
+        devre _BREAKER_OPEN_SECONDS süresince açılır; süre dolunca primary
+        yeniden denenir, ilk hatada devre tekrar açılır.
+        """
+        if not _opens_breaker(error):
+            return
+        self._primary_breaker["failures"] += 1
+        if self._primary_breaker["failures"] >= _BREAKER_FAILURE_THRESHOLD:
+            self._primary_breaker["open_until"] = time.monotonic() + _BREAKER_OPEN_SECONDS
+            logger.warning("primary_circuit_opened",
+                         provider=self.primary.__class__.__name__,
+                         failures=self._primary_breaker["failures"],
+                         open_seconds=_BREAKER_OPEN_SECONDS)
+
+    def force_close(self):
+        """Primary devre kesicisini sıfırlar."""
+        self._primary_breaker = {"failures": 0, "open_until": 0.0}
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        """
+        LLM çıktısını parça parça üretir.
+        Primary ilk parçadan önce başarısız olursa fallback'e geçer; akış
+        başladıktan sonraki hatalar çağırana iletilir.
+        """
+        providers = [self.primary] + ([self.fallback] if self.fallback else [])
+        error_types = []
+        if self._primary_circuit_open():
+            providers = providers[1:]
+            error_types.append("CircuitOpen")
+
+        for provider in providers:
+            started = False
+            stream = provider.generate_stream(
                 prompt=prompt,
                 system_prompt=system_prompt,
                 temperature=temperature,
                 max_tokens=max_tokens
             )
-            self._current_provider = self.primary
-            logger.info("primary_provider_success", provider=self.primary.__class__.__name__)
-            return result
+            try:
+                async for chunk in stream:
+                    if not started:
+                        started = True
+                        self._current_provider = provider
+                        if provider is self.primary:
+                            self._primary_breaker["failures"] = 0
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                error_types.append(type(e).__name__)
+                logger.warning("stream_provider_failed",
+                             provider=provider.__class__.__name__,
+                             error_type=type(e).__name__,
+                             error=str(e))
+                if provider is self.primary:
+                    self._record_primary_failure(e)
+            finally:
+                await stream.aclose()
+
+        fallback_error = error_types[1] if len(error_types) > 1 else "yok"
+        raise RuntimeError(f"Tüm LLM provider'lar başarısız oldu: primary={error_types[0]}, fallback={fallback_error}")
+
+    async def generate_until(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        stop_when: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """
+        Akışlı üretim yapar; her parçadan sonra stop_when(birikmiş metin)
+        True dönerse akışı keser ve o ana kadarki metni döndürür.
+        """
+        chunks: List[str] = []
+        stream = self.generate_stream(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                if stop_when is not None and stop_when("".join(chunks)):
+                    logger.debug("llm_stream_stopped_early", chunks=len(chunks))
+                    break
+        finally:
+            await stream.aclose()
+        return "".join(chunks)
 
-        except Exception as e:
-            error_type = type(e).__name__
-            logger.warning("primary_provider_failed", 
-                         provider=self.primary.__class__.__name__,
-                         error_type=error_type,
-                         error=str(e))
-
-            # Fallback dene
-            if self.fallback:
-                try:
-                    logger.info("trying_fallback_provider", provider=self.fallback.__class__.__name__)
-                    result = await self.fallback.generate(
-                        prompt=prompt,
-                        system_prompt=system_prompt,
-                        temperature=temperature,
-                        max_tokens=max_tokens
-                    )
-                    self._current_provider = self.fallback
-                    logger.info("fallback_provider_success", provider=self.fallback.__class__.__name__)
-                    return result
-
-                except Exception as e2:
-                    error_type2 = type(e2).__name__
-                    logger.error("fallback_provider_failed", 
-                               provider=self.fallback.__class__.__name__,
-                               error_type=error_type2,
-                               error=str(e2))
-                    raise RuntimeError(f"Tüm LLM provider'lar başarısız oldu: primary={error_type}, fallback={error_type2}")
-
-            raise RuntimeError(f"Tüm LLM provider'lar başarısız oldu: primary={error_type}, fallback=yok")
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        max_concurrency: int = 10
+    ) -> List[Any]:
+        """
+        Birbirinden bağımsız prompt'ları en fazla max_concurrency eşzamanlı
+        çağrıyla üretir. Sonuçlar prompt sırasıyla döner; başarısız olan
+        prompt'un yerinde exception bulunur.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _generate_one(prompt: str) -> str:
+            async with semaphore:
+                return await self.generate(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+
+        return await asyncio.gather(*[_generate_one(prompt) for prompt in prompts], return_exceptions=True)
+
+    async def aclose(self):
+        """Bitmemiş ısınma görevini iptal eder, provider bağlantılarını kapatır."""
+        if self._warmup_task is not None:
+            if not self._warmup_task.done():
+                self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+            self._warmup_task = None
+        await self.primary.aclose()
+        if self.fallback:
+            await self.fallback.aclose()
 
     @property
     def current_provider_name(self) -> str:
@@ -565,4 +951,14 @@ def get_llm_provider(
         fallback=fallback_provider.__class__.__name__ if fallback_provider else "none"
     )
 
-    return LLMProvider(primary_provider, fallback_provider)
+    llm = LLMProvider(primary_provider, fallback_provider)
+
+    # Çalışan event loop varsa primary bağlantısı arka planda ısıtılır
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        llm._warmup_task = asyncio.create_task(primary_provider.warmup())
+
+    return llm
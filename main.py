@@ -19,7 +19,7 @@ from dotenv import load_dotenv
 # Konfigürasyon
 load_dotenv()
 
-from config.settings import settings
+from config.settings import get_settings
 from database.connection import get_database
 from database.seed_data import seed_database
 from llm.provider import get_llm_provider
@@ -64,6 +64,7 @@ class UniversitySupportSystem:
             return
 
         logger.info("system_initializing")
+        settings = get_settings()
 
         # 1. Veritabanı
         logger.info("initializing_database")
@@ -149,6 +150,11 @@ class UniversitySupportSystem:
         self._initialized = True
         logger.info("system_initialized", departments=["it", "student_affairs", "finance", "academic_affairs", "library"])
 
+    async def shutdown(self):
+        """LLM bağlantılarını ve bekleyen arka plan görevlerini kapatır."""
+        if self.llm is not None:
+            await self.llm.aclose()
+
     async def process_message(self, message: str, user_id: str = None, context_id: str = None) -> str:
         """Kullanıcı mesajını işler."""
         if not self._initialized:
@@ -227,6 +233,8 @@ async def interactive_demo():
             logger.error("demo_error", error=str(e))
             print(f"\nHata: {e}")
 
+    await system.shutdown()
+
 
 async def run_example_queries():
     """Örnek sorguları çalıştırır."""
@@ -260,6 +268,8 @@ async def run_example_queries():
 
         print()
 
+    await system.shutdown()
+
 
 def main():
     """Ana fonksiyon."""
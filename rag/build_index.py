@@ -9,7 +9,7 @@ ya da
 from pathlib import Path
 import structlog
 
-from config.settings import settings
+from config.settings import get_settings
 from rag.vector_store import DepartmentVectorStore
 
 logger = structlog.get_logger()
@@ -30,6 +30,7 @@ def _load_department_docs(dept_dir: Path):
 
 
 def rebuild():
+    settings = get_settings()
     data_dir = Path(settings.data_dir)
     chroma_dir = Path(settings.chroma_dir)
 